@@ -0,0 +1,204 @@
+from functools import partial
+
+import streamlit as st
+
+from admin_sidebar import show_admin_sidebar
+import metrics
+from app_state import (
+    REPORT_REFRESH_SECONDS,
+    VOTER_LIST_PAGE_SIZE,
+    admin_password,
+    check_admin_password,
+    get_agenda,
+    get_roster,
+    get_token_table,
+    get_vote_store,
+    roster_source,
+    sync_vote_store,
+    voting_url,
+)
+from quorum import outcomes
+from vote_store import ALL, NOT_YET_VOTED, VOTED
+
+# ================================
+# 管理者與投票報表頁（需輸入密碼）
+# ================================
+if admin_password() is None:
+    st.error("尚未設定管理者密碼，請設定環境變數 ADMIN_PASSWORD 或在 secrets.toml 加入 ADMIN_PASSWORD。")
+    st.stop()
+
+if not st.session_state.get("admin_authenticated"):
+    st.header("管理者登入")
+    with st.form("admin_login"):
+        entered = st.text_input("管理者密碼", type="password", key="admin_password")
+        login = st.form_submit_button("登入")
+    if login and check_admin_password(entered):
+        st.session_state["admin_authenticated"] = True
+        st.rerun()
+    elif login:
+        st.error("密碼錯誤。")
+    st.stop()
+
+AGENDA = get_agenda()
+ISSUES = AGENDA.issues
+roster = get_roster()
+vote_store = get_vote_store(roster.digest, ISSUES, roster) if roster is not None else None
+if vote_store is not None:
+    sync_vote_store(vote_store)
+
+# ================================
+# 管理者專區
+# ================================
+household_url = partial(voting_url, get_token_table(roster.digest, roster)) if roster is not None else None
+show_admin_sidebar(roster, vote_store, AGENDA, household_url, roster_source())
+
+# ================================
+# 投票即時報表
+# ================================
+st.header("投票即時報表")
+
+@st.cache_resource(max_entries=2)
+def get_report_snapshot(roster_digest, issues, version, _store):
+    """
+    取得指定計票版本的計票結果，所有觀看報表的工作階段共用
+    議題設定重新載入後會建立新的投票紀錄，版本號可能與舊的相同，所以鍵值也要包含議題
+    """
+    return _store.tally()
+
+@st.cache_resource(max_entries=2)
+def get_building_snapshot(roster_digest, issues, version, _store):
+    """
+    取得指定計票版本的各棟統計，所有觀看報表的工作階段共用
+    """
+    return _store.building_tally()
+
+@st.cache_resource(max_entries=2)
+def get_turnout_heatmap(roster_digest, issues, turnout_versions, _roster, _grid_present):
+    """
+    各棟出席率熱度圖，只有某棟的出席數變動（turnout_versions 改變）時才重新繪製
+    """
+    from building_report import turnout_heatmap_png
+
+    return turnout_heatmap_png(_roster, _grid_present)
+
+def show_building_report():
+    """
+    各棟出席狀況：熱度圖、出席率表與單一議題的各棟結果
+    第一次顯示時才載入 matplotlib 與繪圖函式
+    """
+    from building_report import results_frame, turnout_frame
+
+    buildings = get_building_snapshot(roster.digest, ISSUES, vote_store.version, vote_store)
+    heatmap = get_turnout_heatmap(
+        roster.digest, ISSUES, tuple(buildings.turnout_versions.tolist()), roster, buildings.grid_present
+    )
+    st.image(heatmap, caption="各棟各樓層出席率（出席戶數 / 戶數）")
+    st.dataframe(turnout_frame(roster, buildings), hide_index=True)
+    i = st.selectbox(
+        "各棟表決結果", range(len(ISSUES)), format_func=lambda i: ISSUES[i].title, key="building_issue"
+    )
+    st.dataframe(results_frame(roster, buildings, ISSUES[i], i), hide_index=True)
+
+def reset_voter_list_page(page_key):
+    st.session_state[page_key] = 1
+
+def show_voter_list(i):
+    """
+    分頁顯示議題的投票名單，可依棟別與投票狀態篩選，只傳送目前這一頁
+    """
+    issue = ISSUES[i]
+    page_key = f"list_page_{issue.id}"
+    col1, col2, col3 = st.columns(3)
+    # 更換篩選條件時回到第一頁
+    building = col1.selectbox(
+        "棟別", ("全部",) + roster.building_names, key=f"list_building_{issue.id}",
+        on_change=reset_voter_list_page, args=(page_key,),
+    )
+    status = col2.selectbox(
+        "投票狀態", (VOTED, NOT_YET_VOTED, ALL) + issue.options, key=f"list_status_{issue.id}",
+        on_change=reset_voter_list_page, args=(page_key,),
+    )
+
+    def fetch(page):
+        return vote_store.voter_page(
+            i,
+            status=status,
+            building=None if building == "全部" else building,
+            offset=(page - 1) * VOTER_LIST_PAGE_SIZE,
+            limit=VOTER_LIST_PAGE_SIZE,
+        )
+
+    # 先依目前的頁次查詢，得知總頁數後才建立頁次欄位
+    page = st.session_state.get(page_key, 1)
+    frame, total = fetch(page)
+    page_count = max(1, -(-total // VOTER_LIST_PAGE_SIZE))
+    if page > page_count:
+        # 總頁數會變動（例如未投票名單隨投票變短），超過時改為最後一頁，頁次欄位也一併更新
+        page = page_count
+        st.session_state[page_key] = page
+        frame, total = fetch(page)
+    col3.number_input("頁次", min_value=1, max_value=page_count, step=1, key=page_key)
+    st.caption(f"共 {total} 戶，第 {page} / {page_count} 頁")
+    st.dataframe(frame)
+
+@st.fragment(run_every=REPORT_REFRESH_SECONDS)
+def show_report():
+    """
+    投票即時報表，定時獨立更新，不會重新執行整份程式
+
+    每次只比對計票版本號，有新選票時才重新取得計票結果與已投票清單。
+    """
+    with metrics.REPORT_RENDER_SECONDS.time():
+        # 其他伺服器程序有新選票時才會改變計票版本號
+        sync_vote_store(vote_store)
+        tally = get_report_snapshot(roster.digest, ISSUES, vote_store.version, vote_store)
+        # 投影模式只顯示統計數字，不顯示名單
+        projector_mode = st.toggle("投影模式（隱藏已投票清單）", key="projector_mode")
+
+        present, results = outcomes(tally, roster, AGENDA)
+        st.subheader("出席狀況")
+        col1, col2 = st.columns(2)
+        col1.metric("出席戶數", f"{present.present_count} / {present.total_count}")
+        col2.metric(
+            "出席區分比例",
+            f"{roster.units_to_decimal(present.present_units)} / {roster.units_to_decimal(present.total_units)}",
+        )
+        quorum = AGENDA.quorum
+        if present.reached:
+            st.success(f"已達開會門檻（戶數 {quorum.households}、區分比例 {quorum.ratio}）")
+        else:
+            st.warning(f"尚未達到開會門檻（戶數 {quorum.households}、區分比例 {quorum.ratio}）")
+        with st.expander("各棟出席狀況", expanded=projector_mode):
+            show_building_report()
+        st.write("---")
+
+        for i, issue in enumerate(ISSUES):
+            st.subheader(f"📊 {issue.title}")
+            total_votes = int(tally.counts[i].sum())
+            if total_votes:
+                st.info(f"目前總投票人數：{total_votes}")
+                majority = issue.majority
+                verdict = "通過" if results[i].passed else "未通過"
+                st.markdown(
+                    f"**表決結果：{verdict}**（「{issue.pass_option}」須達出席戶數 {majority.households}"
+                    f"及出席區分比例 {majority.ratio}）"
+                )
+            
+                cols = st.columns(len(issue.options))
+                for col, choice, count, units in zip(cols, issue.options, tally.counts[i], tally.ratio_units[i]):
+                    ratio = roster.units_to_decimal(units)
+                    with col:
+                        st.metric(label=f"{choice}票數", value=int(count), delta=f"{ratio}")
+                        st.write("區分比例：", f"{ratio}")
+            
+                if not projector_mode:
+                    with st.expander("已投票清單"):
+                        show_voter_list(i)
+            else:
+                st.info("尚無投票記錄。")
+            st.write("---")
+
+if roster is not None:
+    show_report()
+else:
+    st.info("名冊資料載入失敗，無法顯示報表。")
@@ -0,0 +1,190 @@
+import io
+import os
+import time
+
+import pandas as pd
+import streamlit as st
+
+import metrics
+
+# ================================
+# 管理者專區
+# ================================
+# 只有管理頁會載入這個模組；QR Code、壓縮檔與匯出用的套件也只在第一次使用對應功能時才載入
+
+# 批次產生 QR Code 時使用的程序數，未設定時依可用的 CPU 數，最多 4 個（見 qr_codes.default_workers）
+QR_WORKERS = int(os.environ.get("QR_WORKERS", "0")) or None
+
+# QR Code 圖片快取：記憶體中保留的張數，以及選填的磁碟快取目錄
+QR_CACHE_SIZE = int(os.environ.get("QR_CACHE_SIZE", "2048"))
+QR_CACHE_DIR = os.environ.get("QR_CACHE_DIR") or None
+
+# 列印用頁面可選的每頁排列（欄, 列）
+SHEET_GRIDS = ((3, 4), (2, 3), (4, 5))
+
+
+@st.cache_resource
+def get_qr_cache():
+    from qr_codes import QrImageCache
+
+    return QrImageCache(QR_CACHE_SIZE, QR_CACHE_DIR)
+
+
+def show_admin_sidebar(roster, vote_store, agenda, voting_url, roster_source):
+    """
+    顯示管理者側邊欄：QR Code 產生器、計票稽核、委託出席、匯出與效能指標
+    """
+    st.sidebar.header("管理者專區")
+    if roster is not None:
+        st.sidebar.markdown(f"名冊來源：{roster_source}（共 {len(roster)} 戶）")
+
+    if roster is not None:
+        st.sidebar.divider()
+        st.sidebar.subheader("QR Code 產生器")
+
+        # 批次產生 QR Code
+        st.sidebar.markdown("##### 批次產生所有戶號的 QR Code")
+        if st.sidebar.button("產生所有 QR Code 壓縮檔"):
+            import zipfile
+
+            jobs = []
+            for household_id in roster.households:
+                jobs.append((household_id, voting_url(household_id), f"戶號: {household_id}"))
+
+            progress = st.sidebar.progress(0.0, text="正在產生 QR Code...")
+            zip_buffer = io.BytesIO()
+            # PNG 本身已經壓縮過，壓縮檔內直接儲存即可
+            with metrics.QR_ZIP_SECONDS.time(), zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zipf:
+                for done, (household_id, png) in enumerate(get_qr_cache().render_many(jobs, QR_WORKERS), start=1):
+                    zipf.writestr(f"{household_id}_qrcode.png", png)
+                    progress.progress(done / len(jobs), text=f"正在產生 QR Code...（{done}/{len(jobs)}）")
+            progress.empty()
+
+            st.sidebar.download_button(
+                label="下載 QR Code 壓縮檔",
+                data=zip_buffer.getvalue(),
+                file_name="all_qrcodes.zip",
+                mime="application/zip"
+            )
+            st.sidebar.success("QR Code 壓縮檔已產生！")
+
+        # 列印用頁面：每張 A4 排入多個 QR Code
+        st.sidebar.markdown("##### 產生列印用 QR Code 頁面（A4）")
+        sheet_grid = st.sidebar.selectbox("每頁排列（欄 × 列）", SHEET_GRIDS, format_func=lambda g: f"{g[0]} × {g[1]}")
+        sheet_format = st.sidebar.radio("輸出格式", ("PDF", "PNG 頁面壓縮檔"), key="sheet_format", horizontal=True)
+        if st.sidebar.button("產生列印用頁面"):
+            import zipfile
+            from qr_codes import iter_sheet_pages, sheets_to_pdf
+
+            jobs = [(household_id, voting_url(household_id), f"戶號: {household_id}") for household_id in roster.households]
+            per_page = sheet_grid[0] * sheet_grid[1]
+            page_count = -(-len(jobs) // per_page)
+            progress = st.sidebar.progress(0.0, text="正在排版列印頁面...")
+            pages = [None] * page_count
+            with metrics.QR_SHEET_SECONDS.time():
+                for done, (page_no, png) in enumerate(iter_sheet_pages(jobs, *sheet_grid, QR_WORKERS), start=1):
+                    pages[page_no] = png
+                    progress.progress(done / page_count, text=f"正在排版列印頁面...（{done}/{page_count}）")
+                if sheet_format == "PDF":
+                    data, file_name, mime = sheets_to_pdf(pages), "qrcode_sheets.pdf", "application/pdf"
+                else:
+                    buffer = io.BytesIO()
+                    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+                        for page_no, png in enumerate(pages, start=1):
+                            zipf.writestr(f"qrcode_sheet_{page_no:03d}.png", png)
+                    data, file_name, mime = buffer.getvalue(), "qrcode_sheets.zip", "application/zip"
+            progress.empty()
+
+            st.sidebar.download_button(
+                label="下載列印用頁面",
+                data=data,
+                file_name=file_name,
+                mime=mime
+            )
+            st.sidebar.success(f"已產生 {page_count} 頁列印用頁面！")
+
+        # 單一產生 QR Code
+        st.sidebar.markdown("---")
+        st.sidebar.markdown("##### 單一產生 QR Code")
+        household_for_qr = st.sidebar.selectbox(
+            "請選擇要產生 QR Code 的戶號：",
+            options=['請選擇'] + list(roster.households)
+        )
+
+        if household_for_qr != '請選擇':
+            full_url = voting_url(household_for_qr)
+            png = get_qr_cache().render(full_url, f"戶號: {household_for_qr}")
+            st.sidebar.markdown(f"#### 戶號: {household_for_qr}")
+            st.sidebar.image(png, caption="請掃描此 QR Code 進行投票")
+            st.sidebar.download_button(
+                label="下載 QR Code 圖片",
+                data=png,
+                file_name=f"{household_for_qr}_qrcode.png",
+                mime="image/png"
+            )
+
+        # 計票稽核
+        st.sidebar.divider()
+        st.sidebar.subheader("計票稽核")
+        if st.sidebar.button("由全部選票重新計票並比對"):
+            if vote_store.audit():
+                st.sidebar.success("累計結果與重新計票結果一致。")
+            else:
+                st.sidebar.error("累計結果與重新計票結果不一致，請檢查選票資料庫。")
+
+        # 匯出計票結果：按下按鈕時才由投票紀錄逐列產生檔案
+        st.sidebar.divider()
+        st.sidebar.subheader("匯出計票結果")
+        export_format = st.sidebar.radio("格式", ("Excel（多工作表）", "CSV"), key="export_format", horizontal=True)
+        if st.sidebar.button("產生匯出檔"):
+            from export import results_csv_zip, results_xlsx
+
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            if export_format == "CSV":
+                # 按下下載按鈕會重新執行頁面、按鈕隨即消失，所以兩個 CSV 放在同一個壓縮檔中一次下載
+                st.sidebar.download_button(
+                    label="下載計票結果與投票明細 CSV（ZIP）",
+                    data=results_csv_zip(vote_store, roster, agenda, stamp),
+                    file_name=f"投票結果_{stamp}.zip",
+                    mime="application/zip"
+                )
+            else:
+                st.sidebar.download_button(
+                    label="下載 Excel 檔",
+                    data=results_xlsx(vote_store, roster, agenda),
+                    file_name=f"投票結果_{stamp}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+
+        # 委託出席
+        st.sidebar.divider()
+        st.sidebar.subheader("委託出席")
+        with st.sidebar.form("proxy_form", clear_on_submit=True):
+            principal = st.selectbox("委託戶", roster.households, key="proxy_principal")
+            holder = st.selectbox("受託人戶號", roster.households, key="proxy_holder")
+            proxy_submitted = st.form_submit_button("登記委託")
+        if proxy_submitted:
+            try:
+                vote_store.assign_proxy(principal, holder)
+                st.sidebar.success(f"已登記 {principal} 委託 {holder} 出席。")
+            except ValueError as e:
+                st.sidebar.error(f"無法登記委託：{e}")
+        proxies = vote_store.proxies()
+        if proxies:
+            with st.sidebar.expander(f"已登記委託（{len(proxies)} 筆）"):
+                st.dataframe(pd.DataFrame(proxies, columns=['委託戶', '受託人']), hide_index=True)
+    else:
+        st.sidebar.warning("名冊資料載入失敗，QR Code 產生器無法使用。")
+
+    # 效能指標
+    st.sidebar.divider()
+    st.sidebar.subheader("效能指標")
+    metrics_text = metrics.REGISTRY.render()
+    st.sidebar.download_button(
+        label="下載效能指標",
+        data=metrics_text,
+        file_name="metrics.txt",
+        mime="text/plain"
+    )
+    with st.sidebar.expander("檢視效能指標"):
+        st.code(metrics_text, language=None)
@@ -0,0 +1,578 @@
+import hmac
+import logging
+import os
+from urllib.parse import urlencode
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from ballot_log import BallotLog
+from issues import IssueConfigError, load_agenda
+import metrics
+from roster import EXPECTED_RATIO_TOTAL, Roster, RosterError, load_roster_file
+from vote_store import VoteStore
+from vote_tokens import TokenTable, load_secret
+
+# ================================
+# 各頁面共用的設定與資源
+# ================================
+# 投票頁與管理頁都從這裡取得名冊、投票紀錄等共用物件，
+# st.cache_resource 以模組與函式名稱為鍵值，所以不同頁面取得的是同一份
+
+# 設定您的應用程式公開網址
+# 如果您重新部署或網址變動，請務必更新此處
+APP_URL = "https://acidcocco.onrender.com"
+
+# 選票資料庫位置，重新啟動後會從這裡還原所有選票
+# 同一台主機上以多個 streamlit run 程序分擔流量時，請全部指向同一個檔案（不可放在網路磁碟），
+# 並設定相同的 VOTE_TOKEN_SECRET；各程序會自動同步其他程序記錄的選票
+VOTE_DB_PATH = os.environ.get("VOTE_DB_PATH", "votes.db")
+
+# 名冊檔案（CSV 或 Excel，需包含「戶號」與「區分比例」欄位）
+# 檔案不存在時改用下方內嵌的名冊資料
+ROSTER_PATH = os.environ.get("ROSTER_PATH", "data.csv")
+
+# 名冊區分比例合計的預期值（例如以萬分比記錄的社區設為 10000），合計不符時拒絕載入名冊
+ROSTER_RATIO_TOTAL = float(os.environ.get("ROSTER_RATIO_TOTAL", EXPECTED_RATIO_TOTAL))
+
+# 投票即時報表自動更新的間隔（秒）
+REPORT_REFRESH_SECONDS = float(os.environ.get("REPORT_REFRESH_SECONDS", "3"))
+
+# 已投票清單每頁顯示的戶數
+VOTER_LIST_PAGE_SIZE = 50
+
+# 議題設定檔（JSON），每個議題有固定的代號與各自的選項
+ISSUES_PATH = os.environ.get("ISSUES_PATH", "issues.json")
+
+# 投票連結驗證碼的金鑰檔（未設定環境變數 VOTE_TOKEN_SECRET 時使用）
+# 部署到檔案系統不會保存的環境時，請改設定 VOTE_TOKEN_SECRET，否則重新部署後 QR Code 會失效
+VOTE_TOKEN_SECRET_PATH = os.environ.get("VOTE_TOKEN_SECRET_PATH", ".vote_token_secret")
+
+# 設定後會在此連接埠提供 Prometheus 格式的 /metrics 端點
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+# /metrics 端點監聽的位址，預設只接受本機連線；端點沒有驗證，改為 0.0.0.0 前請先以防火牆限制來源
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+
+# ================================
+# 效能指標
+# ================================
+@st.cache_resource
+def start_metrics_server(port, host):
+    """
+    啟動 /metrics 端點；連接埠已被占用（例如多個伺服器程序設定了同一個 METRICS_PORT）時
+    只記錄警告並回傳 None，效能指標不可影響投票頁面
+    """
+    try:
+        return metrics.serve(port, host=host)
+    except OSError as e:
+        logging.getLogger(__name__).warning("無法在 %s:%s 啟動 /metrics 端點：%s", host, port, e)
+        return None
+
+@st.cache_resource
+def get_session_tracker():
+    return metrics.SessionTracker()
+
+def track_session():
+    """
+    記錄目前工作階段的最近活動時間，並視需要啟動 /metrics 端點
+    """
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+    script_ctx = get_script_run_ctx()
+    if script_ctx is not None:
+        get_session_tracker().touch(script_ctx.session_id)
+
+# ================================
+# 管理者密碼
+# ================================
+def admin_password():
+    """
+    管理頁的密碼：環境變數 ADMIN_PASSWORD 優先，其次為 st.secrets，皆未設定時回傳 None
+    """
+    password = os.environ.get("ADMIN_PASSWORD")
+    if password:
+        return password
+    try:
+        return st.secrets.get("ADMIN_PASSWORD") or None
+    except FileNotFoundError:
+        # 沒有 secrets.toml
+        return None
+
+def check_admin_password(entered):
+    expected = admin_password()
+    return expected is not None and hmac.compare_digest(entered.encode("utf-8"), expected.encode("utf-8"))
+
+# ================================
+# 議題清單
+# ================================
+@st.cache_resource
+def load_issue_config(path, mtime_ns):
+    """
+    讀取議題設定檔（含出席與表決門檻），檔案修改時間改變才重新讀取
+    """
+    return load_agenda(path)
+
+def get_agenda():
+    """
+    取得目前的會議設定，設定檔有誤時顯示錯誤並停止執行這一頁
+    """
+    try:
+        return load_issue_config(ISSUES_PATH, os.stat(ISSUES_PATH).st_mtime_ns)
+    except (IssueConfigError, OSError) as e:
+        st.error(f"議題設定載入失敗：{e}")
+        st.stop()
+
+# ================================
+# 名冊
+# ================================
+# 內嵌名冊資料
+RAW_DATA = [
+    {"戶號": "C1-3F", "區分比例": 0.3227},
+    {"戶號": "C1-4F", "區分比例": 0.3227},
+    {"戶號": "C1-5F", "區分比例": 0.3227},
+    {"戶號": "C1-6F", "區分比例": 0.3227},
+    {"戶號": "C1-7F", "區分比例": 0.3227},
+    {"戶號": "C1-8F", "區分比例": 0.3227},
+    {"戶號": "C1-9F", "區分比例": 0.3227},
+    {"戶號": "C1-10F", "區分比例": 0.3227},
+    {"戶號": "C1-11F", "區分比例": 0.3227},
+    {"戶號": "C1-12F", "區分比例": 0.3227},
+    {"戶號": "C1-13F", "區分比例": 0.3227},
+    {"戶號": "C1-14F", "區分比例": 0.3581},
+    {"戶號": "C2-3F", "區分比例": 0.3227},
+    {"戶號": "C2-4F", "區分比例": 0.3227},
+    {"戶號": "C2-5F", "區分比例": 0.3227},
+    {"戶號": "C2-6F", "區分比例": 0.3227},
+    {"戶號": "C2-7F", "區分比例": 0.3227},
+    {"戶號": "C2-8F", "區分比例": 0.3227},
+    {"戶號": "C2-9F", "區分比例": 0.3227},
+    {"戶號": "C2-10F", "區分比例": 0.3227},
+    {"戶號": "C2-11F", "區分比例": 0.3227},
+    {"戶號": "C2-12F", "區分比例": 0.3227},
+    {"戶號": "C2-13F", "區分比例": 0.3227},
+    {"戶號": "C2-14F", "區分比例": 0.3581},
+    {"戶號": "B5-2F", "區分比例": 0.2596},
+    {"戶號": "B5-3F", "區分比例": 0.2587},
+    {"戶號": "B5-4F", "區分比例": 0.2587},
+    {"戶號": "B5-5F", "區分比例": 0.2587},
+    {"戶號": "B5-6F", "區分比例": 0.2587},
+    {"戶號": "B5-7F", "區分比例": 0.2587},
+    {"戶號": "B5-8F", "區分比例": 0.2587},
+    {"戶號": "B5-9F", "區分比例": 0.2587},
+    {"戶號": "B5-10F", "區分比例": 0.2587},
+    {"戶號": "B5-11F", "區分比例": 0.2587},
+    {"戶號": "B5-12F", "區分比例": 0.2587},
+    {"戶號": "B5-13F", "區分比例": 0.2587},
+    {"戶號": "B3-2F", "區分比例": 0.2538},
+    {"戶號": "B3-3F", "區分比例": 0.2538},
+    {"戶號": "B3-4F", "區分比例": 0.2538},
+    {"戶號": "B3-5F", "區分比例": 0.2538},
+    {"戶號": "B3-6F", "區分比例": 0.2538},
+    {"戶號": "B3-7F", "區分比例": 0.2538},
+    {"戶號": "B3-8F", "區分比例": 0.2538},
+    {"戶號": "B3-9F", "區分比例": 0.2538},
+    {"戶號": "B3-10F", "區分比例": 0.2538},
+    {"戶號": "B3-11F", "區分比例": 0.2538},
+    {"戶號": "B3-12F", "區分比例": 0.2538},
+    {"戶號": "B3-13F", "區分比例": 0.2538},
+    {"戶號": "B1-2F", "區分比例": 0.246},
+    {"戶號": "B1-3F", "區分比例": 0.2464},
+    {"戶號": "B1-4F", "區分比例": 0.2464},
+    {"戶號": "B1-5F", "區分比例": 0.2464},
+    {"戶號": "B1-6F", "區分比例": 0.2464},
+    {"戶號": "B1-7F", "區分比例": 0.2464},
+    {"戶號": "B1-8F", "區分比例": 0.2464},
+    {"戶號": "B1-9F", "區分比例": 0.2464},
+    {"戶號": "B1-10F", "區分比例": 0.2464},
+    {"戶號": "B1-11F", "區分比例": 0.2464},
+    {"戶號": "B1-12F", "區分比例": 0.2464},
+    {"戶號": "B1-13F", "區分比例": 0.2464},
+    {"戶號": "B2-2F", "區分比例": 0.2496},
+    {"戶號": "B2-3F", "區分比例": 0.2498},
+    {"戶號": "B2-4F", "區分比例": 0.2498},
+    {"戶號": "B2-5F", "區分比例": 0.2498},
+    {"戶號": "B2-6F", "區分比例": 0.2498},
+    {"戶號": "B2-7F", "區分比例": 0.2498},
+    {"戶號": "B2-8F", "區分比例": 0.2498},
+    {"戶號": "B2-9F", "區分比例": 0.2498},
+    {"戶號": "B2-10F", "區分比例": 0.2498},
+    {"戶號": "B2-11F", "區分比例": 0.2498},
+    {"戶號": "B2-12F", "區分比例": 0.2498},
+    {"戶號": "B2-13F", "區分比例": 0.2498},
+    {"戶號": "A5-2F", "區分比例": 0.2527},
+    {"戶號": "A5-3F", "區分比例": 0.2529},
+    {"戶號": "A5-4F", "區分比例": 0.2529},
+    {"戶號": "A5-5F", "區分比例": 0.2529},
+    {"戶號": "A5-6F", "區分比例": 0.2529},
+    {"戶號": "A5-7F", "區分比例": 0.2529},
+    {"戶號": "A5-8F", "區分比例": 0.2529},
+    {"戶號": "A5-9F", "區分比例": 0.2529},
+    {"戶號": "A5-10F", "區分比例": 0.2529},
+    {"戶號": "A5-11F", "區分比例": 0.2529},
+    {"戶號": "A5-12F", "區分比例": 0.2529},
+    {"戶號": "A5-13F", "區分比例": 0.2529},
+    {"戶號": "A3-2F", "區分比例": 0.2491},
+    {"戶號": "A3-3F", "區分比例": 0.2493},
+    {"戶號": "A3-4F", "區分比例": 0.2493},
+    {"戶號": "A3-5F", "區分比例": 0.2493},
+    {"戶號": "A3-6F", "區分比例": 0.2493},
+    {"戶號": "A3-7F", "區分比例": 0.2493},
+    {"戶號": "A3-8F", "區分比例": 0.2493},
+    {"戶號": "A3-9F", "區分比例": 0.2493},
+    {"戶號": "A3-10F", "區分比例": 0.2493},
+    {"戶號": "A3-11F", "區分比例": 0.2493},
+    {"戶號": "A3-12F", "區分比例": 0.2493},
+    {"戶號": "A3-13F", "區分比例": 0.2493},
+    {"戶號": "A2-2F", "區分比例": 0.3046},
+    {"戶號": "A2-3F", "區分比例": 0.2532},
+    {"戶號": "A2-4F", "區分比例": 0.2532},
+    {"戶號": "A2-5F", "區分比例": 0.2532},
+    {"戶號": "A2-6F", "區分比例": 0.2532},
+    {"戶號": "A2-7F", "區分比例": 0.2532},
+    {"戶號": "A2-8F", "區分比例": 0.2532},
+    {"戶號": "A2-9F", "區分比例": 0.2532},
+    {"戶號": "A2-10F", "區分比例": 0.2532},
+    {"戶號": "A2-11F", "區分比例": 0.2532},
+    {"戶號": "A2-12F", "區分比例": 0.2532},
+    {"戶號": "A2-13F", "區分比例": 0.2532},
+    {"戶號": "A1-3F", "區分比例": 0.2534},
+    {"戶號": "A1-4F", "區分比例": 0.2534},
+    {"戶號": "A1-5F", "區分比例": 0.2534},
+    {"戶號": "A1-6F", "區分比例": 0.2534},
+    {"戶號": "A1-7F", "區分比例": 0.2534},
+    {"戶號": "A1-8F", "區分比例": 0.2534},
+    {"戶號": "A1-9F", "區分比例": 0.2534},
+    {"戶號": "A1-10F", "區分比例": 0.2534},
+    {"戶號": "A1-11F", "區分比例": 0.2534},
+    {"戶號": "A1-12F", "區分比例": 0.2534},
+    {"戶號": "A1-13F", "區分比例": 0.2534},
+    {"戶號": "J3-3F", "區分比例": 0.2575},
+    {"戶號": "J3-4F", "區分比例": 0.2575},
+    {"戶號": "J3-5F", "區分比例": 0.2575},
+    {"戶號": "J3-6F", "區分比例": 0.2575},
+    {"戶號": "J3-7F", "區分比例": 0.2575},
+    {"戶號": "J3-8F", "區分比例": 0.2575},
+    {"戶號": "J3-9F", "區分比例": 0.2575},
+    {"戶號": "J3-10F", "區分比例": 0.2575},
+    {"戶號": "J3-11F", "區分比例": 0.2575},
+    {"戶號": "J3-12F", "區分比例": 0.2575},
+    {"戶號": "J3-13F", "區分比例": 0.2575},
+    {"戶號": "J2-2F", "區分比例": 0.2717},
+    {"戶號": "J2-3F", "區分比例": 0.2528},
+    {"戶號": "J2-4F", "區分比例": 0.2528},
+    {"戶號": "J2-5F", "區分比例": 0.2528},
+    {"戶號": "J2-6F", "區分比例": 0.2528},
+    {"戶號": "J2-7F", "區分比例": 0.2528},
+    {"戶號": "J2-8F", "區分比例": 0.2528},
+    {"戶號": "J2-9F", "區分比例": 0.2528},
+    {"戶號": "J2-10F", "區分比例": 0.2528},
+    {"戶號": "J2-11F", "區分比例": 0.2528},
+    {"戶號": "J2-12F", "區分比例": 0.2528},
+    {"戶號": "J2-13F", "區分比例": 0.2528},
+    {"戶號": "J1-2F", "區分比例": 0.252},
+    {"戶號": "J1-3F", "區分比例": 0.2522},
+    {"戶號": "J1-4F", "區分比例": 0.2522},
+    {"戶號": "J1-5F", "區分比例": 0.2522},
+    {"戶號": "J1-6F", "區分比例": 0.2522},
+    {"戶號": "J1-7F", "區分比例": 0.2522},
+    {"戶號": "J1-8F", "區分比例": 0.2522},
+    {"戶號": "J1-9F", "區分比例": 0.2522},
+    {"戶號": "J1-10F", "區分比例": 0.2522},
+    {"戶號": "J1-11F", "區分比例": 0.2522},
+    {"戶號": "J1-12F", "區分比例": 0.2522},
+    {"戶號": "J1-13F", "區分比例": 0.2522},
+    {"戶號": "I2-2F", "區分比例": 0.2563},
+    {"戶號": "I2-3F", "區分比例": 0.2563},
+    {"戶號": "I2-4F", "區分比例": 0.2563},
+    {"戶號": "I2-5F", "區分比例": 0.2563},
+    {"戶號": "I2-6F", "區分比例": 0.2563},
+    {"戶號": "I2-7F", "區分比例": 0.2563},
+    {"戶號": "I2-8F", "區分比例": 0.2563},
+    {"戶號": "I2-9F", "區分比例": 0.2563},
+    {"戶號": "I2-10F", "區分比例": 0.2563},
+    {"戶號": "I2-11F", "區分比例": 0.2563},
+    {"戶號": "I2-12F", "區分比例": 0.2563},
+    {"戶號": "I2-13F", "區分比例": 0.2563},
+    {"戶號": "I1-2F", "區分比例": 0.2559},
+    {"戶號": "I1-3F", "區分比例": 0.2559},
+    {"戶號": "I1-4F", "區分比例": 0.2559},
+    {"戶號": "I1-5F", "區分比例": 0.2559},
+    {"戶號": "I1-6F", "區分比例": 0.2559},
+    {"戶號": "I1-7F", "區分比例": 0.2559},
+    {"戶號": "I1-8F", "區分比例": 0.2559},
+    {"戶號": "I1-9F", "區分比例": 0.2559},
+    {"戶號": "I1-10F", "區分比例": 0.2559},
+    {"戶號": "I1-11F", "區分比例": 0.2559},
+    {"戶號": "I1-12F", "區分比例": 0.2559},
+    {"戶號": "I1-13F", "區分比例": 0.2559},
+    {"戶號": "H2-2F", "區分比例": 0.3072},
+    {"戶號": "H2-3F", "區分比例": 0.3072},
+    {"戶號": "H2-4F", "區分比例": 0.3072},
+    {"戶號": "H2-5F", "區分比例": 0.3072},
+    {"戶號": "H2-6F", "區分比例": 0.3072},
+    {"戶號": "H2-7F", "區分比例": 0.3072},
+    {"戶號": "H2-8F", "區分比例": 0.3072},
+    {"戶號": "H2-9F", "區分比例": 0.3072},
+    {"戶號": "H2-10F", "區分比例": 0.3072},
+    {"戶號": "H2-11F", "區分比例": 0.3072},
+    {"戶號": "H2-12F", "區分比例": 0.3072},
+    {"戶號": "H2-13F", "區分比例": 0.3072},
+    {"戶號": "H2-14F", "區分比例": 0.3503},
+    {"戶號": "H1-2F", "區分比例": 0.3072},
+    {"戶號": "H1-3F", "區分比例": 0.3072},
+    {"戶號": "H1-4F", "區分比例": 0.3072},
+    {"戶號": "H1-5F", "區分比例": 0.3072},
+    {"戶號": "H1-6F", "區分比例": 0.3072},
+    {"戶號": "H1-7F", "區分比例": 0.3072},
+    {"戶號": "H1-8F", "區分比例": 0.3072},
+    {"戶號": "H1-9F", "區分比例": 0.3072},
+    {"戶號": "H1-10F", "區分比例": 0.3072},
+    {"戶號": "H1-11F", "區分比例": 0.3072},
+    {"戶號": "H1-12F", "區分比例": 0.3072},
+    {"戶號": "H1-13F", "區分比例": 0.3072},
+    {"戶號": "H1-14F", "區分比例": 0.3503},
+    {"戶號": "G2-2F", "區分比例": 0.2551},
+    {"戶號": "G2-3F", "區分比例": 0.2551},
+    {"戶號": "G2-4F", "區分比例": 0.2551},
+    {"戶號": "G2-5F", "區分比例": 0.2551},
+    {"戶號": "G2-6F", "區分比例": 0.2551},
+    {"戶號": "G2-7F", "區分比例": 0.2551},
+    {"戶號": "G2-8F", "區分比例": 0.2551},
+    {"戶號": "G2-9F", "區分比例": 0.2551},
+    {"戶號": "G2-10F", "區分比例": 0.2551},
+    {"戶號": "G2-11F", "區分比例": 0.2551},
+    {"戶號": "G2-12F", "區分比例": 0.2551},
+    {"戶號": "G2-13F", "區分比例": 0.2551},
+    {"戶號": "G1-2F", "區分比例": 0.2556},
+    {"戶號": "G1-3F", "區分比例": 0.2586},
+    {"戶號": "G1-4F", "區分比例": 0.2586},
+    {"戶號": "G1-5F", "區分比例": 0.2586},
+    {"戶號": "G1-6F", "區分比例": 0.2586},
+    {"戶號": "G1-7F", "區分比例": 0.2586},
+    {"戶號": "G1-8F", "區分比例": 0.2586},
+    {"戶號": "G1-9F", "區分比例": 0.2586},
+    {"戶號": "G1-10F", "區分比例": 0.2586},
+    {"戶號": "G1-11F", "區分比例": 0.2586},
+    {"戶號": "G1-12F", "區分比例": 0.2586},
+    {"戶號": "G1-13F", "區分比例": 0.2586},
+    {"戶號": "F3-2F", "區分比例": 0.25},
+    {"戶號": "F3-3F", "區分比例": 0.2503},
+    {"戶號": "F3-4F", "區分比例": 0.2503},
+    {"戶號": "F3-5F", "區分比例": 0.2503},
+    {"戶號": "F3-6F", "區分比例": 0.2503},
+    {"戶號": "F3-7F", "區分比例": 0.2503},
+    {"戶號": "F3-8F", "區分比例": 0.2503},
+    {"戶號": "F3-9F", "區分比例": 0.2503},
+    {"戶號": "F3-10F", "區分比例": 0.2503},
+    {"戶號": "F3-11F", "區分比例": 0.2503},
+    {"戶號": "F3-12F", "區分比例": 0.2503},
+    {"戶號": "F3-13F", "區分比例": 0.2503},
+    {"戶號": "F2-2F", "區分比例": 0.2705},
+    {"戶號": "F2-3F", "區分比例": 0.2518},
+    {"戶號": "F2-4F", "區分比例": 0.2518},
+    {"戶號": "F2-5F", "區分比例": 0.2518},
+    {"戶號": "F2-6F", "區分比例": 0.2518},
+    {"戶號": "F2-7F", "區分比例": 0.2518},
+    {"戶號": "F2-8F", "區分比例": 0.2518},
+    {"戶號": "F2-9F", "區分比例": 0.2518},
+    {"戶號": "F2-10F", "區分比例": 0.2518},
+    {"戶號": "F2-11F", "區分比例": 0.2518},
+    {"戶號": "F2-12F", "區分比例": 0.2518},
+    {"戶號": "F2-13F", "區分比例": 0.2518},
+    {"戶號": "F1-3F", "區分比例": 0.2564},
+    {"戶號": "F1-4F", "區分比例": 0.2564},
+    {"戶號": "F1-5F", "區分比例": 0.2564},
+    {"戶號": "F1-6F", "區分比例": 0.2564},
+    {"戶號": "F1-7F", "區分比例": 0.2564},
+    {"戶號": "F1-8F", "區分比例": 0.2564},
+    {"戶號": "F1-9F", "區分比例": 0.2564},
+    {"戶號": "F1-10F", "區分比例": 0.2564},
+    {"戶號": "F1-11F", "區分比例": 0.2564},
+    {"戶號": "F1-12F", "區分比例": 0.2564},
+    {"戶號": "F1-13F", "區分比例": 0.2564},
+    {"戶號": "E5-3F", "區分比例": 0.2534},
+    {"戶號": "E5-4F", "區分比例": 0.2534},
+    {"戶號": "E5-5F", "區分比例": 0.2534},
+    {"戶號": "E5-6F", "區分比例": 0.2534},
+    {"戶號": "E5-7F", "區分比例": 0.2534},
+    {"戶號": "E5-8F", "區分比例": 0.2534},
+    {"戶號": "E5-9F", "區分比例": 0.2534},
+    {"戶號": "E5-10F", "區分比例": 0.2534},
+    {"戶號": "E5-11F", "區分比例": 0.2534},
+    {"戶號": "E5-12F", "區分比例": 0.2534},
+    {"戶號": "E5-13F", "區分比例": 0.2534},
+    {"戶號": "E3-2F", "區分比例": 0.3049},
+    {"戶號": "E3-3F", "區分比例": 0.2532},
+    {"戶號": "E3-4F", "區分比例": 0.2532},
+    {"戶號": "E3-5F", "區分比例": 0.2532},
+    {"戶號": "E3-6F", "區分比例": 0.2532},
+    {"戶號": "E3-7F", "區分比例": 0.2532},
+    {"戶號": "E3-8F", "區分比例": 0.2532},
+    {"戶號": "E3-9F", "區分比例": 0.2532},
+    {"戶號": "E3-10F", "區分比例": 0.2532},
+    {"戶號": "E3-11F", "區分比例": 0.2532},
+    {"戶號": "E3-12F", "區分比例": 0.2532},
+    {"戶號": "E3-13F", "區分比例": 0.2532},
+    {"戶號": "E2-2F", "區分比例": 0.249},
+    {"戶號": "E2-3F", "區分比例": 0.2492},
+    {"戶號": "E2-4F", "區分比例": 0.2492},
+    {"戶號": "E2-5F", "區分比例": 0.2492},
+    {"戶號": "E2-6F", "區分比例": 0.2492},
+    {"戶號": "E2-7F", "區分比例": 0.2492},
+    {"戶號": "E2-8F", "區分比例": 0.2492},
+    {"戶號": "E2-9F", "區分比例": 0.2492},
+    {"戶號": "E2-10F", "區分比例": 0.2492},
+    {"戶號": "E2-11F", "區分比例": 0.2492},
+    {"戶號": "E2-12F", "區分比例": 0.2492},
+    {"戶號": "E2-13F", "區分比例": 0.2492},
+    {"戶號": "E1-2F", "區分比例": 0.2527},
+    {"戶號": "E1-3F", "區分比例": 0.2529},
+    {"戶號": "E1-4F", "區分比例": 0.2529},
+    {"戶號": "E1-5F", "區分比例": 0.2529},
+    {"戶號": "E1-6F", "區分比例": 0.2529},
+    {"戶號": "E1-7F", "區分比例": 0.2529},
+    {"戶號": "E1-8F", "區分比例": 0.2529},
+    {"戶號": "E1-9F", "區分比例": 0.2529},
+    {"戶號": "E1-10F", "區分比例": 0.2529},
+    {"戶號": "E1-11F", "區分比例": 0.2529},
+    {"戶號": "E1-12F", "區分比例": 0.2529},
+    {"戶號": "E1-13F", "區分比例": 0.2529},
+    {"戶號": "D5-2F", "區分比例": 0.2529},
+    {"戶號": "D5-3F", "區分比例": 0.2496},
+    {"戶號": "D5-4F", "區分比例": 0.2498},
+    {"戶號": "D5-5F", "區分比例": 0.2498},
+    {"戶號": "D5-6F", "區分比例": 0.2498},
+    {"戶號": "D5-7F", "區分比例": 0.2498},
+    {"戶號": "D5-8F", "區分比例": 0.2498},
+    {"戶號": "D5-9F", "區分比例": 0.2498},
+    {"戶號": "D5-10F", "區分比例": 0.2498},
+    {"戶號": "D5-11F", "區分比例": 0.2498},
+    {"戶號": "D5-12F", "區分比例": 0.2498},
+    {"戶號": "D5-13F", "區分比例": 0.2498},
+    {"戶號": "D3-2F", "區分比例": 0.2498},
+    {"戶號": "D3-3F", "區分比例": 0.2459},
+    {"戶號": "D3-4F", "區分比例": 0.2463},
+    {"戶號": "D3-5F", "區分比例": 0.2463},
+    {"戶號": "D3-6F", "區分比例": 0.2463},
+    {"戶號": "D3-7F", "區分比例": 0.2463},
+    {"戶號": "D3-8F", "區分比例": 0.2463},
+    {"戶號": "D3-9F", "區分比例": 0.2463},
+    {"戶號": "D3-10F", "區分比例": 0.2463},
+    {"戶號": "D3-11F", "區分比例": 0.2463},
+    {"戶號": "D3-12F", "區分比例": 0.2463},
+    {"戶號": "D3-13F", "區分比例": 0.2463},
+    {"戶號": "D2-2F", "區分比例": 0.2463},
+    {"戶號": "D2-3F", "區分比例": 0.2538},
+    {"戶號": "D2-4F", "區分比例": 0.2538},
+    {"戶號": "D2-5F", "區分比例": 0.2538},
+    {"戶號": "D2-6F", "區分比例": 0.2538},
+    {"戶號": "D2-7F", "區分比例": 0.2538},
+    {"戶號": "D2-8F", "區分比例": 0.2538},
+    {"戶號": "D2-9F", "區分比例": 0.2538},
+    {"戶號": "D2-10F", "區分比例": 0.2538},
+    {"戶號": "D2-11F", "區分比例": 0.2538},
+    {"戶號": "D2-12F", "區分比例": 0.2538},
+    {"戶號": "D2-13F", "區分比例": 0.2538},
+    {"戶號": "D1-2F", "區分比例": 0.2538},
+    {"戶號": "D1-3F", "區分比例": 0.2595},
+    {"戶號": "D1-4F", "區分比例": 0.2586},
+    {"戶號": "D1-5F", "區分比例": 0.2586},
+    {"戶號": "D1-6F", "區分比例": 0.2586},
+    {"戶號": "D1-7F", "區分比例": 0.2586},
+    {"戶號": "D1-8F", "區分比例": 0.2586},
+    {"戶號": "D1-9F", "區分比例": 0.2586},
+    {"戶號": "D1-10F", "區分比例": 0.2586},
+    {"戶號": "D1-11F", "區分比例": 0.2586},
+    {"戶號": "D1-12F", "區分比例": 0.2586},
+    {"戶號": "D1-13F", "區分比例": 0.2586},
+    {"戶號": "B1-1F", "區分比例": 0.2586},
+    {"戶號": "A5-1F", "區分比例": 0.2467},
+    {"戶號": "B2-1F", "區分比例": 0.2497},
+    {"戶號": "A3-1F", "區分比例": 0.2489},
+    {"戶號": "A2-1F", "區分比例": 0.2543},
+    {"戶號": "J2-1F", "區分比例": 0.272},
+    {"戶號": "I2-1F", "區分比例": 0.2596},
+    {"戶號": "I1-1F", "區分比例": 0.2608},
+    {"戶號": "H2-1F", "區分比例": 0.2935},
+    {"戶號": "H1-1F", "區分比例": 0.3192},
+    {"戶號": "G2-1F", "區分比例": 0.2598},
+    {"戶號": "G1-1F", "區分比例": 0.2249},
+    {"戶號": "F3-1F", "區分比例": 0.2506},
+    {"戶號": "F2-1F", "區分比例": 0.2706},
+    {"戶號": "E3-1F", "區分比例": 0.2542},
+    {"戶號": "E2-1F", "區分比例": 0.2489},
+    {"戶號": "E1-1F", "區分比例": 0.257},
+    {"戶號": "D5-1F", "區分比例": 0.2467},
+    {"戶號": "D3-1F", "區分比例": 0.2456},
+    {"戶號": "S9", "區分比例": 0.126},
+    {"戶號": "S8", "區分比例": 0.115},
+    {"戶號": "S7", "區分比例": 0.1346},
+    {"戶號": "S6", "區分比例": 0.1794},
+    {"戶號": "S5", "區分比例": 0.1859},
+    {"戶號": "S3", "區分比例": 0.1346},
+    {"戶號": "S2", "區分比例": 0.115},
+    {"戶號": "S1", "區分比例": 0.126},
+]
+
+@st.cache_resource
+def load_embedded_roster():
+    """
+    將內嵌名冊轉換為唯讀的 Roster，每個程序只建立一次
+    """
+    return Roster.from_records(RAW_DATA)
+
+def get_roster():
+    """
+    取得名冊，有名冊檔時使用檔案，否則使用內嵌名冊；載入失敗時顯示錯誤並回傳 None
+    """
+    try:
+        with metrics.ROSTER_LOAD_SECONDS.time():
+            if os.path.exists(ROSTER_PATH):
+                # 檔案未變動時直接取得快取的名冊
+                return load_roster_file(ROSTER_PATH, expected_total=ROSTER_RATIO_TOTAL)
+            return load_embedded_roster()
+    except (RosterError, OSError, ValueError) as e:
+        st.error(f"名冊資料載入失敗：{e}")
+        return None
+
+def roster_source():
+    return ROSTER_PATH if os.path.exists(ROSTER_PATH) else "內嵌名冊"
+
+# ================================
+# 投票紀錄（所有工作階段共用）
+# ================================
+@st.cache_resource
+def get_ballot_log():
+    return BallotLog(VOTE_DB_PATH)
+
+@st.cache_resource
+def get_vote_store(roster_digest, issues, _roster):
+    """
+    建立全程序共用的投票紀錄，每位住戶的工作階段都會取得同一份
+    啟動或名冊、議題更換時從選票資料庫重建計票結果
+    """
+    store = VoteStore(_roster, issues, log=get_ballot_log())
+    store.sync()
+    return store
+
+def sync_vote_store(store):
+    """
+    取回其他伺服器程序新記錄的選票與委託；後端沒有變動時只是一次版本比對
+    """
+    synced = store.sync()
+    if synced:
+        metrics.BALLOTS_SYNCED.inc(synced)
+
+@st.cache_resource
+def get_token_table(roster_digest, _roster):
+    """
+    為名冊中的每一戶簽發投票連結驗證碼，名冊更換時重新簽發
+    """
+    return TokenTable(load_secret(VOTE_TOKEN_SECRET_PATH), _roster.households)
+
+def voting_url(token_table, household_id):
+    """
+    產生該戶專屬的投票網址（含驗證碼）
+    """
+    params = {'戶號': household_id, 'token': token_table.token(household_id)}
+    return f"{APP_URL}?{urlencode(params)}"
@@ -0,0 +1,228 @@
+import sqlite3
+import threading
+import time
+
+# ================================
+# 選票持久化紀錄（SQLite WAL）
+# ================================
+# issue 為議題代號，choice 為該議題的選項代碼
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ballots (
+    seq INTEGER PRIMARY KEY,
+    household TEXT NOT NULL,
+    issue TEXT NOT NULL,
+    choice INTEGER NOT NULL,
+    cast_at REAL NOT NULL,
+    UNIQUE (household, issue)
+)
+"""
+# 委託出席：principal 為委託戶，holder 為受託代為投票的戶號
+PROXY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS proxies (
+    principal TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    assigned_at REAL NOT NULL
+)
+"""
+# 受託人的選票同時替委託戶記錄相同的選擇；委託戶已自行投票的議題保留原本的選票
+COPY_TO_PRINCIPALS = """
+INSERT OR IGNORE INTO ballots (household, issue, choice, cast_at)
+SELECT principal, ?, ?, ? FROM proxies WHERE holder = ?
+"""
+SCHEMA_VERSION = 1
+
+# 多個伺服器（replica）共用同一個資料庫檔案時，等待其他程序寫入鎖的秒數
+BUSY_TIMEOUT_SECONDS = 30
+
+
+class _Request:
+    def __init__(self, rows):
+        self.rows = rows
+        self.written = False
+        self.error = None
+        self.done = threading.Event()
+
+
+class BallotLog:
+    """
+    只可附加的選票紀錄，存放於 WAL 模式的 SQLite 資料庫
+
+    同時送出的多張選票由背景寫入執行緒合併成一次交易提交（group commit），
+    所以尖峰時段每張選票不必各自等待一次 fsync。
+
+    同一台主機上的多個 Streamlit 程序可以共用同一個資料庫檔案：寫入由 SQLite 的鎖排序，
+    (戶號, 議題) 的唯一限制保證同一戶不會在不同程序各投一次；
+    讀取使用另一條連線，data_version 可以低成本地得知其他程序是否寫入了新資料。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL 模式下 FULL 會在每次提交時 fsync，確保重新啟動後選票不會遺失
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._init_schema()
+        # 讀取專用的連線，讀取時不必等待寫入執行緒的提交
+        self._reader = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False, isolation_level=None)
+        self._read_lock = threading.Lock()
+
+        self._db_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._queue = []
+        # 寫入執行緒意外結束時的原因，之後送出的選票直接失敗，不會無限期等待
+        self._writer_error = None
+        self._writer = threading.Thread(target=self._run, name="ballot-log-writer", daemon=True)
+        self._writer.start()
+
+    def _init_schema(self):
+        # 多個伺服器程序可能同時開啟同一個新資料庫：檢查版本、建立資料表與寫入版本在同一筆寫入交易中完成，
+        # 其他程序要等這筆交易提交後才讀得到版本，不會看到已有資料表、版本卻還是 0 的中間狀態
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            has_table = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ballots'"
+            ).fetchone()
+            if has_table and version != SCHEMA_VERSION:
+                # 不是由這個版本建立的資料庫，無法確定選票對應到目前的議題設定
+                raise sqlite3.DatabaseError(f"選票資料庫 {self.path} 的格式不符，請改用新的 VOTE_DB_PATH")
+            self._conn.execute(SCHEMA)
+            self._conn.execute(PROXY_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def append(self, rows):
+        """
+        寫入一戶的選票 [(戶號, 議題代號, 選項代碼), ...]，等到資料確實寫入磁碟後才回傳
+
+        同一次呼叫的選票視為一筆不可分割的交易：只要其中一張因該戶已投過此議題而無法寫入，
+        整批都不會寫入並回傳 False。
+        該戶若為受託人，同一筆交易也會替委託戶中尚未投票的議題記錄相同的選擇。
+        寫入失敗或寫入執行緒已停止時引發 sqlite3.Error。
+        """
+        request = _Request(rows)
+        with self._cond:
+            if self._writer_error is not None:
+                raise self._writer_error
+            self._queue.append(request)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.written
+
+    def changes(self, after_seq):
+        """
+        讀回序號大於 after_seq 的選票 [(序號, 戶號, 議題代號, 選項代碼), ...]，依寫入順序排列
+        """
+        with self._read_lock:
+            cursor = self._reader.execute(
+                "SELECT seq, household, issue, choice FROM ballots WHERE seq > ? ORDER BY seq", (after_seq,)
+            )
+            return cursor.fetchall()
+
+    def data_version(self):
+        """
+        其他連線（包括其他程序）每次提交寫入後就會改變的版本值，只讀取記憶體中的狀態，成本很低
+        """
+        with self._read_lock:
+            return self._reader.execute("PRAGMA data_version").fetchone()[0]
+
+    def add_proxy(self, principal, holder):
+        """
+        記錄委託出席，無法登記時回傳 False
+
+        同一委託戶只能有一位受託人，受託人不可再委託他人、委託戶也不可再受託。
+        檢查與寫入在同一個寫入交易中進行，多個程序同時登記時也不會形成委託鏈。
+        受託人已經投過的議題，同一筆交易也會替委託戶記錄相同的選擇（委託戶已自行投票的除外）。
+        委託登記次數很少，直接在呼叫端的執行緒寫入，不經過選票的合併提交佇列。
+        """
+        with self._db_lock:
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    conflict = self._conn.execute(
+                        "SELECT 1 FROM proxies WHERE principal IN (?, ?) OR holder = ? LIMIT 1",
+                        (principal, holder, principal),
+                    ).fetchone()
+                    if conflict:
+                        return False
+                    now = time.time()
+                    self._conn.execute(
+                        "INSERT INTO proxies (principal, holder, assigned_at) VALUES (?, ?, ?)",
+                        (principal, holder, now),
+                    )
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO ballots (household, issue, choice, cast_at) "
+                        "SELECT ?, issue, choice, ? FROM ballots WHERE household = ? ORDER BY seq",
+                        (principal, now, holder),
+                    )
+            except sqlite3.IntegrityError:
+                return False
+        return True
+
+    def proxies_since(self, after_id):
+        """
+        讀回編號大於 after_id 的委託出席 [(編號, 委託戶, 受託戶), ...]
+        """
+        with self._read_lock:
+            cursor = self._reader.execute(
+                "SELECT rowid, principal, holder FROM proxies WHERE rowid > ? ORDER BY rowid", (after_id,)
+            )
+            return cursor.fetchall()
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._queue:
+                        self._cond.wait()
+                    batch, self._queue = self._queue, []
+                # 提交期間新送達的選票會累積在佇列中，下一輪一併提交
+                try:
+                    with self._db_lock:
+                        self._commit(batch)
+                except BaseException as e:
+                    for request in batch:
+                        request.written = False
+                        request.error = sqlite3.OperationalError(f"選票寫入執行緒發生錯誤：{e!r}")
+                    raise
+                finally:
+                    for request in batch:
+                        request.done.set()
+        finally:
+            # 寫入執行緒停止後，佇列中與之後送出的選票都直接失敗
+            with self._cond:
+                self._writer_error = sqlite3.OperationalError("選票寫入執行緒已停止")
+                pending, self._queue = self._queue, []
+            for request in pending:
+                request.error = self._writer_error
+                request.done.set()
+
+    def _commit(self, batch):
+        now = time.time()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for request in batch:
+                # 每筆請求各自一個 savepoint，失敗時只撤回該筆，不影響同批其他人的選票
+                self._conn.execute("SAVEPOINT request")
+                request.written = True
+                for household, issue, choice in request.rows:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO ballots (household, issue, choice, cast_at) VALUES (?, ?, ?, ?)",
+                        (household, issue, choice, now),
+                    )
+                    if cursor.rowcount != 1:
+                        request.written = False
+                        break
+                if request.written:
+                    for household, issue, choice in request.rows:
+                        self._conn.execute(COPY_TO_PRINCIPALS, (issue, choice, now, household))
+                else:
+                    self._conn.execute("ROLLBACK TO request")
+                self._conn.execute("RELEASE request")
+            self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            for request in batch:
+                request.error = e
@@ -0,0 +1,362 @@
+"""
+模擬多戶同時掃描 QR Code 投票的壓力測試
+
+分兩個階段：
+1. 工作階段：以 streamlit.testing.v1.AppTest 開啟多個工作階段，每個代表一戶，
+   先載入投票頁，再一次送出所有議題的投票；另外開啟幾個登入管理頁、只看報表的工作階段。
+   統計每次重新執行整份程式的延遲（p50/p99）與每個工作階段佔用的記憶體。
+   AppTest 無法在同一個程序中平行執行，因此各工作階段的重新執行依序進行。
+2. 投票寫入：以多個執行緒同時對共用的 VoteStore 送出選票（寫入真實的 SQLite 選票資料庫），
+   統計每次投票的延遲與每秒可完成的投票數，涵蓋 group commit 的效果。
+3. 多程序（選用，--replicas 大於 1 時）：模擬多個伺服器程序共用同一個選票資料庫，
+   各程序分攤一部分住戶同時投票，統計整體每秒完成的投票數，並確認同步後各程序的計票結果一致。
+
+單次執行的延遲（尤其是 p99）雜訊很大，--runs 大於 1 時每次都在新的程序中執行，各項指標取中位數；
+存基準與比較時都建議使用相同的 --runs。
+
+用法：
+    python benchmarks/load_test.py --households 400 --concurrency 50
+    python benchmarks/load_test.py --runs 5 --save-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py --runs 5 --compare benchmarks/baseline.json
+    python benchmarks/load_test.py --replicas 4
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+# 與基準比較時，這些指標越大越差；throughput 越小越差
+LOWER_IS_BETTER = ("rerun_p50_ms", "rerun_p99_ms", "rss_per_session_kb", "cast_p50_ms", "cast_p99_ms")
+HIGHER_IS_BETTER = ("votes_per_second",)
+# 多次執行時取中位數的指標
+MEDIAN_KEYS = LOWER_IS_BETTER + HIGHER_IS_BETTER + ("replica_votes_per_second",)
+
+# AppTest 共用 Streamlit 的全域執行環境，同一時間只能有一個工作階段在執行
+_app_lock = threading.Lock()
+
+
+def rss_kb():
+    """
+    目前程序的常駐記憶體（KB）
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def timed_run(app, latencies, lock):
+    with _app_lock:
+        start = time.perf_counter()
+        app.run()
+        elapsed = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    with lock:
+        latencies.append(elapsed)
+    return app
+
+
+def simulate_voter(household, token, latencies, lock):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    app.query_params["戶號"] = household
+    app.query_params["token"] = token
+    timed_run(app, latencies, lock)
+    submit = [b for b in app.button if b.label == "確認送出投票"]
+    if not submit:
+        raise RuntimeError(f"{household} 的投票頁沒有送出按鈕")
+    submit[0].click()
+    timed_run(app, latencies, lock)
+    return app
+
+
+def open_admin_page(app):
+    """
+    切換到管理頁並以 ADMIN_PASSWORD 登入
+    """
+    with _app_lock:
+        app.run()
+        app.switch_page("admin_page.py").run()
+        app.text_input(key="admin_password").input(os.environ["ADMIN_PASSWORD"])
+        [b for b in app.button if b.label == "登入"][0].click().run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+
+def simulate_viewer(latencies, lock, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    open_admin_page(app)
+    for _ in range(reruns):
+        timed_run(app, latencies, lock)
+    return app
+
+
+def percentiles_ms(seconds):
+    samples = np.array(seconds) * 1000
+    return round(float(np.percentile(samples, 50)), 2), round(float(np.percentile(samples, 99)), 2)
+
+
+def run_sessions(households, tokens, concurrency, viewers, viewer_reruns):
+    """
+    第一階段：多個 AppTest 工作階段的重新執行延遲與記憶體
+    """
+    latencies = []
+    lock = threading.Lock()
+    rss_before = rss_kb()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        voter_jobs = [pool.submit(simulate_voter, h, tokens.token(h), latencies, lock) for h in households]
+        viewer_jobs = [pool.submit(simulate_viewer, latencies, lock, viewer_reruns) for _ in range(viewers)]
+        # 保留所有工作階段直到量測完記憶體
+        sessions = [job.result() for job in voter_jobs + viewer_jobs]
+    rss_after = rss_kb()
+
+    p50, p99 = percentiles_ms(latencies)
+    return {
+        "reruns": len(latencies),
+        "rerun_p50_ms": p50,
+        "rerun_p99_ms": p99,
+        "rss_per_session_kb": round((rss_after - rss_before) / max(1, len(sessions)), 1),
+    }
+
+
+def run_vote_path(roster, issues, households, concurrency, db_path):
+    """
+    第二階段：多個執行緒同時投票時，每次投票的延遲與每秒完成的投票數
+    """
+    from ballot_log import BallotLog
+    from vote_store import VoteStore
+
+    store = VoteStore(roster, issues, log=BallotLog(db_path))
+    latencies = []
+    lock = threading.Lock()
+
+    def cast(household):
+        choices = {i: issue.options[0] for i, issue in enumerate(issues)}
+        start = time.perf_counter()
+        if not store.cast_ballots(household, choices):
+            raise RuntimeError(f"{household} 投票失敗")
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(cast, households))
+    elapsed = time.perf_counter() - start
+
+    p50, p99 = percentiles_ms(latencies)
+    return {
+        "cast_p50_ms": p50,
+        "cast_p99_ms": p99,
+        "votes_per_second": round(len(households) / elapsed, 2),
+    }
+
+
+def replica_worker(index, replicas, households, concurrency, db_path, start_at):
+    """
+    在獨立程序中代表一個伺服器程序：建立自己的 VoteStore，對分配到的住戶投票，結果以 JSON 印出
+    """
+    from ballot_log import BallotLog
+    from issues import load_issues
+    from roster import load_roster_file
+    from vote_store import VoteStore
+
+    roster = load_roster_file(os.path.join(ROOT, "data.csv"))
+    issues = load_issues(os.path.join(ROOT, "issues.json"))
+    share = list(roster.households[:households])[index::replicas]
+    store = VoteStore(roster, issues, log=BallotLog(db_path))
+    store.sync()
+    choices = {i: issue.options[0] for i, issue in enumerate(issues)}
+    # 所有程序都準備好之後才同時開始
+    time.sleep(max(0.0, start_at - time.time()))
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        cast = list(pool.map(lambda h: store.cast_ballots(h, choices), share))
+    finished = time.time()
+    # 等其他程序寫完後再同步一次，比對各程序的計票結果
+    time.sleep(1.0)
+    store.sync()
+    print(json.dumps({"finished": finished, "cast": sum(cast), "counts": store.tally().counts.tolist()}))
+
+
+def run_replicas(households, replicas, concurrency, db_path):
+    """
+    第三階段：多個程序共用同一個選票資料庫時的整體投票吞吐量
+    """
+    start_at = time.time() + 5.0
+    procs = [
+        subprocess.Popen(
+            [
+                sys.executable, os.path.abspath(__file__),
+                "--replica-worker", str(index), "--replicas", str(replicas),
+                "--households", str(households), "--concurrency", str(concurrency),
+                "--db-path", db_path, "--start-at", str(start_at),
+            ],
+            stdout=subprocess.PIPE, text=True, cwd=ROOT,
+        )
+        for index in range(replicas)
+    ]
+    outcomes = []
+    for proc in procs:
+        stdout, _ = proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError("多程序投票的工作程序執行失敗")
+        outcomes.append(json.loads(stdout.strip().splitlines()[-1]))
+
+    if sum(o["cast"] for o in outcomes) != households:
+        raise RuntimeError("多程序投票時有選票未寫入")
+    if any(o["counts"] != outcomes[0]["counts"] for o in outcomes):
+        raise RuntimeError("同步後各程序的計票結果不一致")
+    elapsed = max(o["finished"] for o in outcomes) - start_at
+    return {
+        "replicas": replicas,
+        "replica_votes_per_second": round(households / elapsed, 2),
+    }
+
+
+def run(households, concurrency, viewers, viewer_reruns, workdir, replicas=1):
+    from issues import load_issues
+    from roster import load_roster_file
+    from vote_tokens import TokenTable
+
+    roster = load_roster_file(os.path.join(ROOT, "data.csv"))
+    issues = load_issues(os.path.join(ROOT, "issues.json"))
+    targets = list(roster.households[:households])
+
+    result = {
+        "households": len(targets),
+        "concurrency": concurrency,
+        "viewers": viewers,
+    }
+    tokens = TokenTable(os.environ["VOTE_TOKEN_SECRET"].encode("utf-8"), targets)
+    result.update(run_sessions(targets, tokens, concurrency, viewers, viewer_reruns))
+    result.update(run_vote_path(roster, issues, targets, concurrency, os.path.join(workdir, "vote_path.db")))
+    if replicas > 1:
+        result.update(run_replicas(len(targets), replicas, concurrency, os.path.join(workdir, "replicas.db")))
+    result.update({
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    })
+    return result
+
+
+def run_repeated(args):
+    """
+    在各自獨立的程序中執行 args.runs 次，各項指標取中位數
+
+    每次都用新的程序，記憶體與 Streamlit 快取不會受前一次執行影響。
+    """
+    command = [
+        sys.executable, os.path.abspath(__file__), "--run-once",
+        "--households", str(args.households), "--concurrency", str(args.concurrency),
+        "--viewers", str(args.viewers), "--viewer-reruns", str(args.viewer_reruns),
+        "--replicas", str(args.replicas),
+    ]
+    results = []
+    for index in range(args.runs):
+        proc = subprocess.run(command, stdout=subprocess.PIPE, text=True, cwd=ROOT)
+        if proc.returncode != 0:
+            raise RuntimeError(f"第 {index + 1} 次執行失敗")
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        print(f"第 {index + 1}/{args.runs} 次：{results[-1]}", file=sys.stderr)
+
+    result = dict(results[-1], runs=args.runs)
+    for key in MEDIAN_KEYS:
+        if key in result:
+            result[key] = round(float(np.median([r[key] for r in results])), 2)
+    return result
+
+
+def run_once(args):
+    # 使用暫存的選票資料庫，不影響正式資料
+    workdir = tempfile.mkdtemp(prefix="vote-load-test-")
+    os.environ["VOTE_DB_PATH"] = os.path.join(workdir, "votes.db")
+    os.environ["VOTE_TOKEN_SECRET"] = "load-test"
+    os.environ["ADMIN_PASSWORD"] = "load-test"
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    return run(args.households, args.concurrency, args.viewers, args.viewer_reruns, workdir, args.replicas)
+
+
+def compare(result, baseline, tolerance):
+    """
+    與基準結果比較，回傳超出容許範圍的指標說明
+    """
+    regressions = []
+    for key in LOWER_IS_BETTER:
+        if result[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key}: {result[key]} > 基準 {baseline[key]}")
+    for key in HIGHER_IS_BETTER:
+        if result[key] < baseline[key] * (1 - tolerance):
+            regressions.append(f"{key}: {result[key]} < 基準 {baseline[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="社區投票 App 壓力測試")
+    parser.add_argument("--households", type=int, default=400, help="模擬投票的戶數")
+    parser.add_argument("--concurrency", type=int, default=50, help="同時進行的工作階段數")
+    parser.add_argument("--viewers", type=int, default=5, help="只看報表的工作階段數")
+    parser.add_argument("--viewer-reruns", type=int, default=5, help="每個報表工作階段重新執行的次數")
+    parser.add_argument("--replicas", type=int, default=1, help="模擬共用選票資料庫的伺服器程序數，大於 1 時加測多程序投票")
+    parser.add_argument("--runs", type=int, default=1, help="重複執行的次數，大於 1 時各項指標取中位數")
+    parser.add_argument("--run-once", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--replica-worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db-path", help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--save-baseline", metavar="PATH", help="將結果存為基準檔")
+    parser.add_argument("--compare", metavar="PATH", help="與基準檔比較，退步時以非零狀態結束")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="與基準比較時容許的差異比例")
+    args = parser.parse_args()
+
+    if args.replica_worker is not None:
+        sys.path.insert(0, ROOT)
+        replica_worker(
+            args.replica_worker, args.replicas, args.households, args.concurrency, args.db_path, args.start_at
+        )
+        return
+
+    if args.run_once:
+        print(json.dumps(run_once(args), ensure_ascii=False))
+        return
+
+    result = run_repeated(args) if args.runs > 1 else run_once(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        for line in regressions:
+            print(f"效能退步：{line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
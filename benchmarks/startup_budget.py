@@ -0,0 +1,164 @@
+"""
+冷啟動時間預算：量測全新程序載入投票頁與管理頁所需的時間，並列出最耗時的模組載入
+
+每個情境都在新的 Python 程序中以 -X importtime 執行，模擬 Render 休眠後第一位住戶掃描 QR Code：
+1. voter：帶有戶號與驗證碼的投票頁，另外檢查 QR Code、圖片、匯出與圖表相關模組沒有被載入。
+2. admin：登入後的管理者專區與投票報表頁（/admin）。
+量測項目為程序啟動到 Streamlit 載入完成（startup）、第一次執行整份程式（first_render），
+以及第二次重新執行（rerun）的時間。
+
+用法：
+    python benchmarks/startup_budget.py
+    python benchmarks/startup_budget.py --save-budget benchmarks/startup_budget.json
+    python benchmarks/startup_budget.py --budget benchmarks/startup_budget.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+SCENARIOS = ("voter", "admin")
+TIMINGS = ("process_seconds", "startup_seconds", "first_render_seconds", "rerun_seconds")
+
+# 投票頁不應載入的模組（zipfile 由 Streamlit 本身載入，不列入）
+VOTER_FORBIDDEN_MODULES = (
+    "qrcode", "PIL", "openpyxl", "matplotlib",
+    "qr_codes", "admin_page", "admin_sidebar", "export", "building_report",
+)
+
+
+def child(scenario):
+    """
+    在新程序中執行一次情境，將量測結果以 JSON 印到標準輸出
+    """
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    if scenario == "voter":
+        from roster import load_roster_file
+        from vote_tokens import TokenTable
+
+        household = str(load_roster_file(os.path.join(ROOT, "data.csv")).households[0])
+        tokens = TokenTable(os.environ["VOTE_TOKEN_SECRET"].encode("utf-8"), [household])
+        app.query_params["戶號"] = household
+        app.query_params["token"] = tokens.token(household)
+    loaded = time.perf_counter()
+    app.run()
+    if scenario == "admin":
+        app.switch_page("admin_page.py").run()
+        app.text_input(key="admin_password").input(os.environ["ADMIN_PASSWORD"])
+        [b for b in app.button if b.label == "登入"][0].click().run()
+    rendered = time.perf_counter()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    app.run()
+    rerun = time.perf_counter() - rendered
+
+    print(json.dumps({
+        "startup_seconds": round(loaded - started, 3),
+        "first_render_seconds": round(rendered - loaded, 3),
+        "rerun_seconds": round(rerun, 3),
+        "loaded_modules": sorted(m for m in VOTER_FORBIDDEN_MODULES if m in sys.modules),
+    }))
+
+
+def parse_importtime(stderr, top):
+    """
+    由 -X importtime 的輸出取出累計載入時間最長的最上層模組 {模組: 毫秒}
+    """
+    totals = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # 沒有縮排的才是由程式直接載入的最上層模組
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            totals.append((name.strip(), round(int(cumulative) / 1000, 1)))
+    return dict(sorted(totals, key=lambda item: -item[1])[:top])
+
+
+def measure(scenario, workdir, top):
+    env = dict(os.environ)
+    env["VOTE_DB_PATH"] = os.path.join(workdir, f"{scenario}.db")
+    env["VOTE_TOKEN_SECRET"] = "startup-budget"
+    env["ADMIN_PASSWORD"] = "startup-budget"
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", scenario],
+        capture_output=True, text=True, env=env, cwd=ROOT,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{scenario} 情境執行失敗：\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = round(elapsed, 3)
+    result["slowest_imports_ms"] = parse_importtime(proc.stderr, top)
+    return result
+
+
+def check(results, budget):
+    """
+    與時間預算比較，回傳超出預算或違反延遲載入的說明
+    """
+    violations = []
+    for scenario, result in results.items():
+        for key in TIMINGS:
+            limit = budget.get(scenario, {}).get(key)
+            if limit is not None and result[key] > limit:
+                violations.append(f"{scenario}.{key}: {result[key]} 秒 > 預算 {limit} 秒")
+    loaded = results["voter"]["loaded_modules"]
+    if loaded:
+        violations.append(f"投票頁載入了應延後載入的模組：{', '.join(loaded)}")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="社區投票 App 冷啟動時間預算")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--top", type=int, default=10, help="列出載入最久的模組數")
+    parser.add_argument("--save-budget", metavar="PATH", help="以本次結果加上 --headroom 存為時間預算檔")
+    parser.add_argument("--headroom", type=float, default=0.5, help="存為時間預算時額外保留的比例")
+    parser.add_argument("--budget", metavar="PATH", help="與時間預算檔比較，超出時以非零狀態結束")
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="vote-startup-")
+    results = {scenario: measure(scenario, workdir, args.top) for scenario in SCENARIOS}
+    report = dict(results, python=platform.python_version(), platform=platform.platform(), cpu_count=os.cpu_count())
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.save_budget:
+        budget = {
+            scenario: {key: round(result[key] * (1 + args.headroom), 2) for key in TIMINGS}
+            for scenario, result in results.items()
+        }
+        budget.update(python=report["python"], platform=report["platform"], cpu_count=report["cpu_count"])
+        with open(args.save_budget, "w", encoding="utf-8") as f:
+            json.dump(budget, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+    if args.budget:
+        with open(args.budget, encoding="utf-8") as f:
+            budget = json.load(f)
+        violations = check(results, budget)
+        for line in violations:
+            print(f"超出預算：{line}", file=sys.stderr)
+        if violations:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import io
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+# ================================
+# 各棟出席與計票統計
+# ================================
+# 熱度圖每格的尺寸（英吋）與輸出解析度
+HEATMAP_CELL_INCHES = 0.45
+HEATMAP_DPI = 100
+HEATMAP_COLORMAP = "RdYlGn"
+
+
+def turnout_frame(roster, buildings):
+    """
+    各棟出席狀況表，依出席率由低到高排列，方便優先催票
+    """
+    sizes = roster.building_sizes
+    frame = pd.DataFrame({
+        '棟別': roster.building_names,
+        '戶數': sizes,
+        '出席戶數': buildings.present,
+        '未出席戶數': sizes - buildings.present,
+        '出席率': np.round(buildings.present / sizes * 100, 1),
+        '出席區分比例': [str(roster.units_to_decimal(u)) for u in buildings.present_units],
+        '區分比例合計': [str(roster.units_to_decimal(u)) for u in roster.building_units],
+    })
+    return frame.sort_values('出席率', kind='stable').reset_index(drop=True)
+
+
+def results_frame(roster, buildings, issue, i):
+    """
+    單一議題各棟的票數與區分比例
+    """
+    columns = {'棟別': roster.building_names}
+    for code, choice in enumerate(issue.options):
+        columns[f'{choice}票數'] = buildings.counts[i, :, code]
+        columns[f'{choice}區分比例'] = [str(roster.units_to_decimal(u)) for u in buildings.ratio_units[i, :, code]]
+    return pd.DataFrame(columns)
+
+
+def turnout_heatmap_png(roster, grid_present):
+    """
+    繪製（棟別 × 樓層）出席率熱度圖，回傳 PNG 內容
+
+    沒有住戶的格子留白；每格標示「出席 / 戶數」。
+    只使用 matplotlib 的 Figure 物件，不經過 pyplot，多個工作階段同時繪圖也不會互相干擾。
+    """
+    sizes = roster.grid_sizes
+    with np.errstate(invalid='ignore', divide='ignore'):
+        turnout = np.where(sizes > 0, grid_present / sizes, np.nan)
+
+    rows, cols = turnout.shape
+    fig = Figure(figsize=(cols * HEATMAP_CELL_INCHES + 1.5, rows * HEATMAP_CELL_INCHES + 1), dpi=HEATMAP_DPI)
+    ax = fig.add_subplot()
+    image = ax.imshow(np.ma.masked_invalid(turnout), cmap=HEATMAP_COLORMAP, vmin=0, vmax=1, aspect='auto')
+    ax.set_xticks(range(cols))
+    ax.set_xticklabels([f"{f}F" if f else "?" for f in roster.floor_names], fontsize=8)
+    ax.set_yticks(range(rows))
+    ax.set_yticklabels(roster.building_names, fontsize=8)
+    ax.xaxis.tick_top()
+    for b, f in zip(*np.nonzero(sizes)):
+        ax.text(f, b, f"{grid_present[b, f]}/{sizes[b, f]}", ha='center', va='center', fontsize=6)
+    fig.colorbar(image, ax=ax, fraction=0.03, pad=0.02)
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
@@ -0,0 +1,132 @@
+import csv
+import io
+import zipfile
+
+from openpyxl import Workbook
+
+from quorum import outcomes
+
+# ================================
+# 計票結果匯出（CSV / XLSX）
+# ================================
+# 所有資料列都直接由 VoteStore 逐列產生，寫入時不建立中間的 DataFrame
+
+SUMMARY_HEADER = ('議題代號', '議題', '選項', '票數', '區分比例', '表決結果')
+BALLOT_HEADER = ('議題代號', '議題', '戶號', '棟別', '區分比例', '投票', '投票序號')
+
+# Excel 工作表名稱最多 31 個字元，且不可含有下列字元
+SHEET_TITLE_LIMIT = 31
+SHEET_TITLE_INVALID = str.maketrans({c: '_' for c in '[]:*?/\\'})
+
+# CSV 以含 BOM 的 UTF-8 輸出，Excel 直接開啟時中文才不會變成亂碼
+CSV_ENCODING = 'utf-8-sig'
+
+
+def summary_rows(store, roster, agenda):
+    """
+    逐列產生出席狀況與各議題、各選項的計票結果
+    """
+    tally = store.tally()
+    present, results = outcomes(tally, roster, agenda)
+    yield ('', '出席戶數', '', present.present_count, None, '')
+    yield ('', '出席區分比例', '', None, roster.units_to_decimal(present.present_units), '')
+    yield ('', '開會門檻', '', None, None, '已達到' if present.reached else '未達到')
+    for i, issue in enumerate(agenda.issues):
+        verdict = '通過' if results[i].passed else '未通過'
+        for code, choice in enumerate(issue.options):
+            yield (
+                issue.id, issue.title, choice,
+                int(tally.counts[i, code]), roster.units_to_decimal(tally.ratio_units[i, code]),
+                verdict if choice == issue.pass_option else '',
+            )
+
+
+def ballot_rows(store, issue):
+    """
+    逐列產生單一議題的投票明細
+    """
+    meta = store.issues[issue]
+    for household, building, units, choice, order in store.iter_ballots(issue):
+        yield (meta.id, meta.title, household, building, store.roster.units_to_decimal(units), choice, order)
+
+
+def write_csv(rows, header, stream):
+    """
+    將資料列逐列寫入文字串流
+    """
+    writer = csv.writer(stream)
+    writer.writerow(header)
+    writer.writerows(rows)
+
+
+def _csv_bytes(rows, header):
+    buffer = io.BytesIO()
+    stream = io.TextIOWrapper(buffer, encoding=CSV_ENCODING, newline='')
+    write_csv(rows, header, stream)
+    stream.flush()
+    stream.detach()
+    return buffer.getvalue()
+
+
+def summary_csv(store, roster, agenda):
+    """
+    計票結果 CSV
+    """
+    return _csv_bytes(summary_rows(store, roster, agenda), SUMMARY_HEADER)
+
+
+def ballots_csv(store):
+    """
+    所有議題的投票明細 CSV，議題依序接續輸出
+    """
+    def rows():
+        for issue in range(len(store.issues)):
+            yield from ballot_rows(store, issue)
+    return _csv_bytes(rows(), BALLOT_HEADER)
+
+
+def results_csv_zip(store, roster, agenda, stamp):
+    """
+    計票結果與投票明細兩個 CSV 放在同一個壓縮檔，只需下載一次
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f"計票結果_{stamp}.csv", summary_csv(store, roster, agenda))
+        archive.writestr(f"投票明細_{stamp}.csv", ballots_csv(store))
+    return buffer.getvalue()
+
+
+def sheet_title(issue, used):
+    """
+    由議題代號產生合法且不重複的工作表名稱
+    """
+    base = issue.id.translate(SHEET_TITLE_INVALID)[:SHEET_TITLE_LIMIT] or '議題'
+    title, n = base, 1
+    while title.lower() in used:
+        n += 1
+        suffix = f"_{n}"
+        title = base[:SHEET_TITLE_LIMIT - len(suffix)] + suffix
+    used.add(title.lower())
+    return title
+
+
+def results_xlsx(store, roster, agenda):
+    """
+    多工作表 Excel：第一張為計票結果，之後每個議題一張投票明細
+
+    以 openpyxl 的 write-only 模式逐列寫出，記憶體用量不隨名冊大小成長。
+    """
+    workbook = Workbook(write_only=True)
+    used = {'計票結果'}
+    sheet = workbook.create_sheet('計票結果')
+    sheet.append(SUMMARY_HEADER)
+    for row in summary_rows(store, roster, agenda):
+        sheet.append(row)
+    for i, issue in enumerate(store.issues):
+        sheet = workbook.create_sheet(sheet_title(issue, used))
+        sheet.append(BALLOT_HEADER)
+        for row in ballot_rows(store, i):
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,116 @@
+import json
+from collections import namedtuple
+from fractions import Fraction
+
+# ================================
+# 議題設定
+# ================================
+# id 為固定的議題代號，選票資料庫以此記錄議題；options 為該議題的選項
+# pass_option 為表決通過所需的選項，majority 為該選項需達到的出席人數與區分比例門檻
+Issue = namedtuple('Issue', ['id', 'title', 'options', 'pass_option', 'majority'])
+
+# 門檻：households 為人數比例、ratio 為區分比例比例，皆以 Fraction 精確表示
+Thresholds = namedtuple('Thresholds', ['households', 'ratio'])
+
+# 會議設定：議題列表與出席（開會）門檻
+Agenda = namedtuple('Agenda', ['issues', 'quorum'])
+
+DEFAULT_OPTIONS = ('同意', '不同意')
+
+# 預設門檻參照公寓大廈管理條例第 31 條：
+# 區分所有權人三分之二以上及其區分所有權比例合計三分之二以上出席，
+# 以出席人數四分之三以上及其區分所有權比例占出席人數區分所有權四分之三以上之同意行之
+DEFAULT_QUORUM = Thresholds(Fraction(2, 3), Fraction(2, 3))
+DEFAULT_MAJORITY = Thresholds(Fraction(3, 4), Fraction(3, 4))
+
+# 選項代碼以 int8 儲存
+MAX_OPTIONS = 127
+
+
+class IssueConfigError(ValueError):
+    """
+    議題設定檔格式或內容不正確
+    """
+
+
+def parse_fraction(value):
+    """
+    將 "2/3"、"0.75" 或數字轉成 Fraction，須介於 0 與 1 之間
+    """
+    try:
+        fraction = Fraction(str(value).strip())
+    except (ValueError, ZeroDivisionError) as e:
+        raise IssueConfigError(f"門檻格式不正確：{value}") from e
+    if not 0 <= fraction <= 1:
+        raise IssueConfigError(f"門檻須介於 0 與 1 之間：{value}")
+    return fraction
+
+
+def parse_thresholds(config, default):
+    if config is None:
+        return default
+    return Thresholds(
+        parse_fraction(config.get('households', default.households)),
+        parse_fraction(config.get('ratio', default.ratio)),
+    )
+
+
+def parse_issues(config):
+    """
+    由設定內容建立議題列表
+
+    格式為 {"issues": [{"id": ..., "title": ..., "options": [...]}, ...]}，
+    未指定 options 時使用 DEFAULT_OPTIONS；pass_option 預設為第一個選項，
+    majority 為 {"households": "3/4", "ratio": "3/4"}，未指定時使用 DEFAULT_MAJORITY。
+    選項代碼依 options 的順序決定，開始投票後請勿調整選項順序。
+    """
+    entries = config.get('issues') if isinstance(config, dict) else None
+    if not entries:
+        raise IssueConfigError("議題設定檔中沒有任何議題")
+
+    issues = []
+    seen = set()
+    for n, entry in enumerate(entries, start=1):
+        issue_id = str(entry.get('id', '')).strip()
+        title = str(entry.get('title', '')).strip()
+        options = tuple(str(o).strip() for o in entry.get('options', DEFAULT_OPTIONS))
+        if not issue_id or not title:
+            raise IssueConfigError(f"第 {n} 個議題缺少 id 或 title")
+        if issue_id in seen:
+            raise IssueConfigError(f"議題代號重複：{issue_id}")
+        if not 1 <= len(options) <= MAX_OPTIONS or len(set(options)) != len(options) or '' in options:
+            raise IssueConfigError(f"議題 {issue_id} 的選項不正確：{options}")
+        pass_option = str(entry.get('pass_option', options[0])).strip()
+        if pass_option not in options:
+            raise IssueConfigError(f"議題 {issue_id} 的 pass_option 不在選項中：{pass_option}")
+        majority = parse_thresholds(entry.get('majority'), DEFAULT_MAJORITY)
+        seen.add(issue_id)
+        issues.append(Issue(issue_id, title, options, pass_option, majority))
+    return tuple(issues)
+
+
+def parse_agenda(config):
+    """
+    由設定內容建立會議設定，quorum 為 {"households": "2/3", "ratio": "2/3"}，未指定時使用 DEFAULT_QUORUM
+    """
+    issues = parse_issues(config)
+    return Agenda(issues, parse_thresholds(config.get('quorum'), DEFAULT_QUORUM))
+
+
+def load_agenda(path):
+    """
+    讀取 JSON 格式的議題設定檔
+    """
+    with open(path, encoding='utf-8') as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise IssueConfigError(f"議題設定檔格式錯誤：{e}") from e
+    return parse_agenda(config)
+
+
+def load_issues(path):
+    """
+    只讀取議題列表
+    """
+    return load_agenda(path).issues
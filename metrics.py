@@ -0,0 +1,183 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ================================
+# 效能指標（Prometheus 文字格式）
+# ================================
+# 直方圖的預設分界（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        yield f"{self.name} {self._value}"
+
+
+class Gauge:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._value = 0
+
+    def set(self, value):
+        self._value = value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self._value}"
+
+
+class Histogram:
+    """
+    固定分界的直方圖，每次記錄只需一次二分搜尋與加法
+    """
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # 最後一格為超過最大分界的次數
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{bound:g}"}} {cumulative}'
+        cumulative += counts[-1]
+        yield f'{self.name}_bucket{{le="+Inf"}} {cumulative}'
+        yield f"{self.name}_sum {total}"
+        yield f"{self.name}_count {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name, help_text):
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name, help_text):
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def render(self):
+        """
+        以 Prometheus 文字格式輸出所有指標
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 程序內共用的指標
+REGISTRY = Registry()
+
+ROSTER_LOAD_SECONDS = REGISTRY.histogram("vote_roster_load_seconds", "取得名冊所花的時間")
+VOTE_CAST_SECONDS = REGISTRY.histogram("vote_cast_seconds", "一戶送出投票到寫入完成所花的時間")
+BALLOTS_CAST = REGISTRY.counter("vote_ballots_cast_total", "已記錄的選票數")
+BALLOT_WRITE_ERRORS = REGISTRY.counter("vote_ballot_write_errors_total", "選票寫入資料庫失敗、請住戶重新送出的次數")
+BALLOTS_SYNCED = REGISTRY.counter("vote_ballots_synced_total", "由其他伺服器程序寫入、同步到本程序的選票數")
+REPORT_RENDER_SECONDS = REGISTRY.histogram("vote_report_render_seconds", "投票即時報表每次更新所花的時間")
+QR_RENDER_SECONDS = REGISTRY.histogram("vote_qr_render_seconds", "產生單張 QR Code（未命中快取）所花的時間")
+QR_ZIP_SECONDS = REGISTRY.histogram("vote_qr_zip_seconds", "產生所有 QR Code 壓縮檔所花的時間")
+QR_SHEET_SECONDS = REGISTRY.histogram("vote_qr_sheet_seconds", "產生列印用 QR Code 頁面所花的時間")
+SCRIPT_RUN_SECONDS = REGISTRY.histogram("vote_script_run_seconds", "整份程式每次重新執行所花的時間")
+ACTIVE_SESSIONS = REGISTRY.gauge("vote_active_sessions", "最近 5 分鐘內有動作的工作階段數")
+
+
+class SessionTracker:
+    """
+    記錄各工作階段最後一次動作的時間，計算目前活躍的工作階段數
+    """
+
+    def __init__(self, window_seconds=300):
+        self.window_seconds = window_seconds
+        self._last_seen = {}
+        self._lock = threading.Lock()
+
+    def touch(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            self._last_seen[session_id] = now
+            cutoff = now - self.window_seconds
+            for sid in [sid for sid, seen in self._last_seen.items() if seen < cutoff]:
+                del self._last_seen[sid]
+            ACTIVE_SESSIONS.set(len(self._last_seen))
+
+
+def serve(port, registry=REGISTRY, host="127.0.0.1"):
+    """
+    在背景執行緒啟動 /metrics 文字端點，回傳 HTTP 伺服器
+
+    端點沒有驗證，預設只接受本機連線；需要由其他主機抓取時再指定 host。
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,363 @@
+import functools
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+from metrics import QR_RENDER_SECONDS
+
+# ================================
+# 圖片處理函式
+# ================================
+QR_VERSION = 1
+BOX_SIZE = 10
+BORDER = 4
+LABEL_HEIGHT = 50
+LABEL_FONT_SIZE = 30
+
+# 標註文字的字型，需包含中文字才能正確顯示「戶號」
+# 可用環境變數 QR_FONT_PATH 指定，否則依序尋找常見的中文字型
+QR_FONT_PATH = os.environ.get("QR_FONT_PATH")
+CJK_FONT_CANDIDATES = (
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "C:/Windows/Fonts/msjh.ttc",
+)
+
+
+def resolve_font_path(path=QR_FONT_PATH):
+    """
+    回傳第一個存在的字型檔路徑，都找不到時回傳 None
+    """
+    candidates = ((path,) if path else ()) + CJK_FONT_CANDIDATES
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+# 每個程序只尋找一次字型檔
+LABEL_FONT_PATH = resolve_font_path()
+
+# 會影響輸出圖片的所有參數，作為圖片快取鍵值的一部分
+RENDER_PARAMS = (QR_VERSION, BOX_SIZE, BORDER, LABEL_HEIGHT, LABEL_FONT_SIZE, LABEL_FONT_PATH)
+
+
+@functools.lru_cache(maxsize=None)
+def load_label_font(path=LABEL_FONT_PATH, size=LABEL_FONT_SIZE):
+    """
+    載入標註文字的字型，每個程序只解析一次字型檔
+    """
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # 舊版 Pillow 的預設字型無法指定大小
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=4096)
+def label_width(label):
+    return load_label_font().getlength(label)
+
+
+def generate_qr_with_label(text, label):
+    """
+    生成帶有文字標註的 QR Code 圖片
+    """
+    qr = qrcode.QRCode(version=QR_VERSION, box_size=BOX_SIZE, border=BORDER)
+    qr.add_data(text)
+    qr.make(fit=True)
+    img_qr = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
+
+    width, height = img_qr.size
+    img_final = Image.new("RGBA", (width, height + LABEL_HEIGHT), "white")
+    img_final.paste(img_qr, (0, 0))
+
+    draw = ImageDraw.Draw(img_final)
+    font = load_label_font()
+
+    text_width = label_width(label)
+    text_x = (width - text_width) / 2
+    text_y = height + 5
+    draw.text((text_x, text_y), label, (0, 0, 0), font=font)
+
+    return img_final
+
+
+def render_qr_png(text, label):
+    """
+    生成帶有文字標註的 QR Code，回傳 PNG 檔案內容
+    """
+    buf = io.BytesIO()
+    generate_qr_with_label(text, label).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+# ================================
+# 批次產生
+# ================================
+# 每個工作程序一次處理的 QR Code 數量，減少程序間傳遞的次數
+CHUNK_SIZE = 16
+
+
+# 未指定程序數時的上限：每個工作程序都要重新載入 numpy、PIL 與 qrcode，
+# 小型執行個體同時開太多程序可能耗盡記憶體
+DEFAULT_MAX_WORKERS = 4
+
+
+def default_workers():
+    """
+    預設的工作程序數：目前程序可使用的 CPU 數，最多 DEFAULT_MAX_WORKERS 個
+
+    容器中的 os.cpu_count() 回報的是主機的核心數，所以優先使用 sched_getaffinity。
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus, DEFAULT_MAX_WORKERS))
+
+
+def _render_chunk(jobs):
+    return [(key, render_qr_png(text, label)) for key, text, label in jobs]
+
+
+def iter_qr_pngs(jobs, max_workers=None):
+    """
+    以多個程序平行產生 QR Code，jobs 為 [(鍵值, 網址, 標註文字), ...]
+
+    依完成先後逐一回傳 (鍵值, PNG 內容)，呼叫端可以邊收邊寫入壓縮檔並更新進度。
+    max_workers 未指定時使用 default_workers()，為 1 時直接在目前的執行緒產生。
+    """
+    if max_workers is None:
+        max_workers = default_workers()
+    chunks = [jobs[i:i + CHUNK_SIZE] for i in range(0, len(jobs), CHUNK_SIZE)]
+
+    if max_workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from _render_chunk(chunk)
+        return
+
+    # 使用 spawn 建立乾淨的工作程序，避免複製 Streamlit 伺服器的執行緒狀態
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks)), mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(_render_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+# ================================
+# 列印用排版頁面（A4 多格）
+# ================================
+SHEET_DPI = 150
+A4_SIZE_MM = (210, 297)
+SHEET_MARGIN_MM = 10
+SHEET_LABEL_HEIGHT = 40
+SHEET_LABEL_FONT_SIZE = 24
+# 裁切線的灰階值
+SHEET_CUT_LINE = 200
+
+# 頁面版面：page_size 與 cell_size 皆為像素 (寬, 高)，margin 為頁邊像素
+SheetLayout = namedtuple('SheetLayout', ['columns', 'rows', 'page_size', 'margin', 'cell_size'])
+
+
+def sheet_layout(columns, rows, dpi=SHEET_DPI):
+    """
+    計算 A4 頁面切成 columns × rows 格時的像素尺寸
+    """
+    page_w, page_h = (round(mm / 25.4 * dpi) for mm in A4_SIZE_MM)
+    margin = round(SHEET_MARGIN_MM / 25.4 * dpi)
+    cell = ((page_w - 2 * margin) // columns, (page_h - 2 * margin) // rows)
+    return SheetLayout(columns, rows, (page_w, page_h), margin, cell)
+
+
+def qr_matrix(text):
+    """
+    回傳 QR Code 的模組矩陣（含留白邊框），True 為黑色模組
+    """
+    qr = qrcode.QRCode(version=QR_VERSION, border=BORDER)
+    qr.add_data(text)
+    qr.make(fit=True)
+    return np.array(qr.get_matrix(), dtype=bool)
+
+
+def render_sheet_page(jobs, layout):
+    """
+    將一頁的 QR Code 排入預先配置的頁面陣列，jobs 為 [(鍵值, 網址, 標註文字), ...]
+
+    每個 QR Code 只產生一次模組矩陣，放大後直接寫入頁面陣列的對應區塊，
+    不為每一戶另外建立圖片；標註文字與裁切線最後一次畫在整頁上。
+    """
+    page_w, page_h = layout.page_size
+    cell_w, cell_h = layout.cell_size
+    canvas = np.full((page_h, page_w), 255, dtype=np.uint8)
+    cells = []
+    for n, (_, text, label) in enumerate(jobs):
+        row, col = divmod(n, layout.columns)
+        x = layout.margin + col * cell_w
+        y = layout.margin + row * cell_h
+        modules = qr_matrix(text)
+        scale = max(1, min(cell_w, cell_h - SHEET_LABEL_HEIGHT) // len(modules))
+        size = len(modules) * scale
+        left = x + (cell_w - size) // 2
+        top = y + max(0, (cell_h - SHEET_LABEL_HEIGHT - size) // 2)
+        # 每個模組放大成 scale × scale 的方塊
+        block = np.where(modules, 0, 255).astype(np.uint8).repeat(scale, axis=0).repeat(scale, axis=1)
+        canvas[top:top + size, left:left + size] = block
+        cells.append((x, y, top + size, label))
+
+    page = Image.fromarray(canvas, mode="L")
+    draw = ImageDraw.Draw(page)
+    font = load_label_font(size=SHEET_LABEL_FONT_SIZE)
+    for x, y, label_top, label in cells:
+        draw.rectangle((x, y, x + cell_w - 1, y + cell_h - 1), outline=SHEET_CUT_LINE)
+        text_x = x + (cell_w - font.getlength(label)) / 2
+        draw.text((text_x, label_top + 4), label, fill=0, font=font)
+    return page
+
+
+def _render_sheet(page_no, jobs, layout):
+    buf = io.BytesIO()
+    render_sheet_page(jobs, layout).save(buf, format="PNG", dpi=(SHEET_DPI, SHEET_DPI))
+    return page_no, buf.getvalue()
+
+
+def iter_sheet_pages(jobs, columns, rows, max_workers=None):
+    """
+    以多個程序平行產生列印用頁面，jobs 與 iter_qr_pngs 相同，依 jobs 的順序分頁
+
+    依完成先後逐一回傳 (頁次, PNG 內容)，頁次從 0 開始。
+    """
+    layout = sheet_layout(columns, rows)
+    per_page = columns * rows
+    pages = [jobs[i:i + per_page] for i in range(0, len(jobs), per_page)]
+    if max_workers is None:
+        max_workers = default_workers()
+
+    if max_workers <= 1 or len(pages) <= 1:
+        for page_no, page_jobs in enumerate(pages):
+            yield _render_sheet(page_no, page_jobs, layout)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(pages)), mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(_render_sheet, page_no, page_jobs, layout) for page_no, page_jobs in enumerate(pages)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def sheets_to_pdf(pngs):
+    """
+    將依頁次排列的頁面 PNG 合併成多頁 PDF
+    """
+    # 轉成黑白二值頁面，PDF 以 CCITT 壓縮，檔案大小約為灰階的十分之一
+    pages = [Image.open(io.BytesIO(png)).convert("1", dither=Image.Dither.NONE) for png in pngs]
+    buf = io.BytesIO()
+    pages[0].save(buf, format="PDF", resolution=SHEET_DPI, save_all=True, append_images=pages[1:])
+    return buf.getvalue()
+
+
+# ================================
+# 圖片快取
+# ================================
+class QrImageCache:
+    """
+    以內容雜湊為鍵值的 QR Code 圖片快取
+
+    鍵值由網址（含 APP_URL 與戶號）、標註文字與 RENDER_PARAMS 算出，
+    記憶體中保留最近使用的 max_entries 張 PNG；若指定 directory，也會存到磁碟，
+    程式重新啟動後仍可直接取用。
+    """
+
+    def __init__(self, max_entries=2048, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(text, label):
+        content = repr((text, label, RENDER_PARAMS)).encode("utf-8")
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, text, label):
+        key = self.key(text, label)
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                return png
+        if self.directory:
+            path = os.path.join(self.directory, f"{key}.png")
+            try:
+                with open(path, "rb") as f:
+                    png = f.read()
+            except OSError:
+                return None
+            self._remember(key, png)
+        return png
+
+    def put(self, text, label, png):
+        key = self.key(text, label)
+        self._remember(key, png)
+        if self.directory:
+            path = os.path.join(self.directory, f"{key}.png")
+            # 先寫入暫存檔再改名，避免其他工作階段讀到寫到一半的檔案
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key, png):
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def render(self, text, label):
+        """
+        取得單張 QR Code 的 PNG，快取中沒有才重新產生
+        """
+        png = self.get(text, label)
+        if png is None:
+            with QR_RENDER_SECONDS.time():
+                png = render_qr_png(text, label)
+            self.put(text, label, png)
+        return png
+
+    def render_many(self, jobs, max_workers=None):
+        """
+        批次取得 QR Code，jobs 與 iter_qr_pngs 相同
+
+        快取中已有的圖片直接回傳，只有缺少的才交給工作程序產生。
+        """
+        missing = []
+        labels = {}
+        for key, text, label in jobs:
+            png = self.get(text, label)
+            if png is None:
+                missing.append((key, text, label))
+                labels[key] = (text, label)
+            else:
+                yield key, png
+        for key, png in iter_qr_pngs(missing, max_workers):
+            self.put(*labels[key], png)
+            yield key, png
@@ -0,0 +1,56 @@
+from collections import namedtuple
+
+# ================================
+# 出席與表決門檻判定
+# ================================
+# 所有比較都以整數交叉相乘完成：part / whole >= num / den  <=>  part * den >= num * whole，
+# 戶數與區分比例（名冊 ratio_scale 分之一的整數）都是精確值，門檻邊界不會因浮點誤差而翻盤。
+
+# 出席狀態：present_* 為出席戶數與區分比例單位，total_* 為名冊總數
+Attendance = namedtuple('Attendance', ['present_count', 'present_units', 'total_count', 'total_units', 'reached'])
+
+# 單一議題的表決結果：yes_* 為 pass_option 的票數與區分比例單位
+Outcome = namedtuple('Outcome', ['yes_count', 'yes_units', 'passed'])
+
+
+def meets(part, whole, threshold):
+    """
+    判斷 part / whole 是否達到 Fraction 門檻，whole 為 0 時視為未達到
+    """
+    if whole <= 0:
+        return False
+    return part * threshold.denominator >= threshold.numerator * whole
+
+
+def meets_both(count, units, total_count, total_units, thresholds):
+    """
+    人數與區分比例須同時達到門檻
+    """
+    return meets(count, total_count, thresholds.households) and meets(units, total_units, thresholds.ratio)
+
+
+def attendance(tally, roster, agenda):
+    """
+    依計票快照判斷是否達到開會（出席）門檻
+    """
+    total_count, total_units = len(roster), roster.total_units
+    reached = meets_both(tally.present_count, tally.present_units, total_count, total_units, agenda.quorum)
+    return Attendance(tally.present_count, tally.present_units, total_count, total_units, reached)
+
+
+def outcomes(tally, roster, agenda):
+    """
+    回傳 (出席狀態, 各議題表決結果列表)
+
+    表決門檻以出席戶數與出席區分比例為分母；未達開會門檻時所有議題皆不通過。
+    """
+    present = attendance(tally, roster, agenda)
+    results = []
+    for i, issue in enumerate(agenda.issues):
+        code = issue.options.index(issue.pass_option)
+        yes_count, yes_units = int(tally.counts[i, code]), int(tally.ratio_units[i, code])
+        passed = present.reached and meets_both(
+            yes_count, yes_units, present.present_count, present.present_units, issue.majority
+        )
+        results.append(Outcome(yes_count, yes_units, passed))
+    return present, results
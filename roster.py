@@ -0,0 +1,196 @@
+import hashlib
+import io
+import os
+import threading
+from decimal import Decimal
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+# ================================
+# 住戶名冊
+# ================================
+# 區分比例合計的預設預期值與容許誤差，部署時可由 app_state 的 ROSTER_RATIO_TOTAL 覆寫
+EXPECTED_RATIO_TOTAL = 100.0
+RATIO_TOTAL_TOLERANCE = 0.05
+
+# 區分比例換算成整數單位時至少保留的小數位數；名冊的小數位數較多時依名冊資料增加，
+# 計票與門檻比較都用整數運算，不會有浮點誤差
+RATIO_DECIMALS = 4
+# 小數位數上限：超過時 float 已無法精確表示，整數合計也可能超出 int64
+MAX_RATIO_DECIMALS = 12
+
+REQUIRED_COLUMNS = ('戶號', '區分比例')
+TEXT_DTYPES = {'戶號': str, '姓名': str}
+
+
+class RosterError(ValueError):
+    """
+    名冊檔案格式或內容不正確
+    """
+
+
+def building_of(household):
+    """
+    由戶號取出棟別，例如 C1-3F -> C1；店面 S9 -> S
+    """
+    if '-' in household:
+        return household.split('-', 1)[0]
+    return household.rstrip('0123456789') or household
+
+
+def floor_of(household):
+    """
+    由戶號取出樓層，例如 C1-3F -> 3；沒有標示樓層的店面視為 1 樓，無法判斷時回傳 0
+    """
+    if '-' not in household:
+        return 1
+    floor = household.split('-', 1)[1].upper()
+    if floor.endswith('F') and floor[:-1].isdigit():
+        return int(floor[:-1])
+    return 0
+
+
+class Roster:
+    """
+    唯讀的住戶名冊，每個程序只建立一次，所有工作階段共用同一份
+
+    戶號以雜湊索引對應到名冊中的列位置，區分比例存成連續的 float64 陣列，
+    另以 ratio_units 保存換算為 ratio_scale 分之一的整數，供精確計算使用。
+    ratio_decimals 取名冊中最多的小數位數（至少 RATIO_DECIMALS 位）。
+    """
+
+    def __init__(self, households, ratios, names=None, digest=None):
+        self.households = np.array(households, dtype=object)
+        self.households.flags.writeable = False
+        self.ratios = np.array(ratios, dtype=np.float64)
+        self.ratios.flags.writeable = False
+        # 以 float 的最短表示法還原名冊上的寫法，依最多的小數位數換算成整數單位
+        exact = [Decimal(repr(r)) for r in self.ratios.tolist()]
+        self.ratio_decimals = max([RATIO_DECIMALS] + [-d.as_tuple().exponent for d in exact])
+        if self.ratio_decimals > MAX_RATIO_DECIMALS:
+            raise RosterError(f"區分比例最多只能有 {MAX_RATIO_DECIMALS} 位小數")
+        self.ratio_scale = 10 ** self.ratio_decimals
+        self.ratio_units = np.array([int(d.scaleb(self.ratio_decimals)) for d in exact], dtype=np.int64)
+        self.ratio_units.flags.writeable = False
+        self.total_units = int(self.ratio_units.sum())
+        # 戶號 -> 名冊中的列位置
+        self.index = MappingProxyType({h: pos for pos, h in enumerate(self.households)})
+        if len(self.index) != len(self.households):
+            raise RosterError("名冊中有重複的戶號")
+        self.names = tuple(names) if names is not None else None
+        # 棟別：building_names 依名冊中出現的順序排列，building_codes 為每一戶的棟別代碼
+        buildings = [building_of(h) for h in self.households]
+        self.building_names = tuple(dict.fromkeys(buildings))
+        codes = {b: code for code, b in enumerate(self.building_names)}
+        self.building_codes = np.array([codes[b] for b in buildings], dtype=np.int16)
+        self.building_codes.flags.writeable = False
+        # 樓層：floor_names 由低到高排列（0 表示無法判斷），floor_codes 為每一戶的樓層代碼
+        floors = [floor_of(h) for h in self.households]
+        self.floor_names = tuple(sorted(set(floors)))
+        codes = {f: code for code, f in enumerate(self.floor_names)}
+        self.floor_codes = np.array([codes[f] for f in floors], dtype=np.int16)
+        self.floor_codes.flags.writeable = False
+        # 各棟戶數與區分比例合計，以及（棟別 × 樓層）每格的戶數
+        building_count = len(self.building_names)
+        self.building_sizes = np.bincount(self.building_codes, minlength=building_count)
+        self.building_units = np.zeros(building_count, dtype=np.int64)
+        np.add.at(self.building_units, self.building_codes, self.ratio_units)
+        self.grid_sizes = np.zeros((building_count, len(self.floor_names)), dtype=np.int64)
+        np.add.at(self.grid_sizes, (self.building_codes, self.floor_codes), 1)
+        for array in (self.building_sizes, self.building_units, self.grid_sizes):
+            array.flags.writeable = False
+        # 名冊內容的雜湊值，名冊更換時用來區分共用資源
+        if digest is None:
+            content = "\n".join(f"{h},{r!r}" for h, r in zip(self.households, self.ratios))
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        self.digest = digest
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        由 [{'戶號': ..., '區分比例': ...}, ...] 建立名冊
+        """
+        return cls([r['戶號'] for r in records], [r['區分比例'] for r in records])
+
+    def __len__(self):
+        return len(self.households)
+
+    def units_to_decimal(self, units):
+        """
+        將以 ratio_scale 分之一為單位的整數換回區分比例的 Decimal
+        """
+        return Decimal(int(units)).scaleb(-self.ratio_decimals)
+
+    def __contains__(self, household):
+        return household in self.index
+
+
+def parse_roster(data, file_name, expected_total=EXPECTED_RATIO_TOTAL, tolerance=RATIO_TOTAL_TOLERANCE):
+    """
+    解析 CSV 或 Excel 名冊的內容並檢查資料，回傳 Roster
+
+    檢查項目：必要欄位、空白或重複的戶號、缺漏或非正數的區分比例、區分比例合計。
+    """
+    suffix = os.path.splitext(file_name)[1].lower()
+    if suffix in ('.xlsx', '.xlsm'):
+        frame = pd.read_excel(io.BytesIO(data), dtype=TEXT_DTYPES, engine='openpyxl')
+    elif suffix == '.csv':
+        frame = pd.read_csv(io.BytesIO(data), dtype=TEXT_DTYPES, encoding='utf-8-sig')
+    else:
+        raise RosterError(f"不支援的名冊格式：{file_name}")
+
+    frame.columns = [str(c).strip() for c in frame.columns]
+    missing_columns = [c for c in REQUIRED_COLUMNS if c not in frame.columns]
+    if missing_columns:
+        raise RosterError(f"名冊缺少欄位：{'、'.join(missing_columns)}")
+
+    households = frame['戶號'].str.strip()
+    if households.isna().any() or (households == '').any():
+        rows = (frame.index[households.isna() | (households == '')] + 2).tolist()
+        raise RosterError(f"名冊第 {rows} 列缺少戶號")
+    duplicated = households[households.duplicated()].unique().tolist()
+    if duplicated:
+        raise RosterError(f"名冊中有重複的戶號：{'、'.join(duplicated)}")
+
+    ratios = pd.to_numeric(frame['區分比例'], errors='coerce').to_numpy(dtype=np.float64)
+    invalid = ~(ratios > 0)
+    if invalid.any():
+        raise RosterError(f"以下戶號缺少區分比例或數值不正確：{'、'.join(households[invalid])}")
+    total = ratios.sum()
+    if abs(total - expected_total) > tolerance:
+        raise RosterError(f"區分比例合計為 {total:.4f}，與預期的 {expected_total:g} 不符")
+
+    names = frame['姓名'].fillna('').tolist() if '姓名' in frame.columns else None
+    digest = hashlib.sha256(data).hexdigest()
+    return Roster(households.tolist(), ratios, names=names, digest=digest)
+
+
+# 路徑 -> (修改時間, 檔案大小, Roster)
+_roster_cache = {}
+_roster_cache_lock = threading.Lock()
+
+
+def load_roster_file(path, expected_total=EXPECTED_RATIO_TOTAL):
+    """
+    讀取名冊檔案，結果依檔案的修改時間與內容雜湊快取，expected_total 為區分比例合計的預期值
+
+    檔案未變動時只需一次 stat；修改時間變了但內容相同時沿用原本的 Roster，
+    只有內容真的改變才重新解析。
+    """
+    stat = os.stat(path)
+    with _roster_cache_lock:
+        cached = _roster_cache.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if cached is not None and cached[2].digest == digest:
+            roster = cached[2]
+        else:
+            roster = parse_roster(data, path, expected_total=expected_total)
+        _roster_cache[path] = (stat.st_mtime_ns, stat.st_size, roster)
+        return roster
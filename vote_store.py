@@ -0,0 +1,438 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# ================================
+# 共用投票紀錄
+# ================================
+# 尚未投票的選項代碼
+NOT_VOTED = -1
+
+# 已投票清單的篩選條件（其餘條件為選項名稱）
+ALL = '全部'
+VOTED = '已投票'
+NOT_YET_VOTED = '未投票'
+
+# 計票結果快照：counts 與 ratio_units 皆為（議題 × 選項）陣列，
+# 選項較少的議題，多出來的欄位維持為 0；
+# ratio_units 為區分比例合計，以名冊 ratio_scale 分之一為單位的整數，不會累積浮點誤差。
+# present_count、present_units 為出席（至少投過一票）的戶數與區分比例合計
+Tally = namedtuple('Tally', ['counts', 'ratio_units', 'present_count', 'present_units', 'version'])
+
+# 各棟統計快照（棟別順序與 Roster.building_names 相同）：
+# present、present_units 為各棟出席戶數與區分比例；counts、ratio_units 為（議題 × 棟別 × 選項）；
+# grid_present 為（棟別 × 樓層）出席戶數；turnout_versions 為各棟出席數的變動次數
+BuildingTally = namedtuple(
+    'BuildingTally',
+    ['present', 'present_units', 'counts', 'ratio_units', 'grid_present', 'turnout_versions'],
+)
+
+
+class VoteStore:
+    """
+    全程序共用的投票紀錄
+
+    所有瀏覽器工作階段共用同一份選票與計票結果，
+    每次投票只更新該議題的累計數字，報表不需重新篩選整份選票。
+    若提供 log（BallotLog），選票會先寫入磁碟再計入結果。
+    log 就是共用的狀態後端，需提供 append、changes、data_version、add_proxy 與 proxies_since；
+    多個伺服器程序共用同一個後端時，各自保留計票結果，透過 sync() 只套用其他程序新寫入的資料。
+
+    選票依名冊（Roster）順序預先配置成 NumPy 陣列：每個議題、每一戶各佔一格 int8 選項代碼，
+    投票只是一次原地寫入，「已投票清單」等到要顯示時才組成目前這一頁的 DataFrame。
+    選項代碼是該選項在 Issue.options 中的位置，只有顯示時才換回選項名稱。
+
+    區分比例一律以名冊的 ratio_units 整數累加，出席戶數與比例也隨每張選票更新。
+    受託人（委託出席）投票時，同一筆交易也會替所有委託戶記錄相同的選擇；
+    有共用後端時由後端在寫入交易中完成，委託戶的選票再經 sync() 取回。
+    """
+
+    def __init__(self, roster, issues, log=None):
+        # 直接引用共用名冊的陣列與索引，不另外複製
+        self.roster = roster
+        self.households = roster.households
+        self.ratios = roster.ratios
+        self.ratio_units = roster.ratio_units
+        self._index = roster.index
+        self.issues = tuple(issues)
+        self._issue_index = {issue.id: i for i, issue in enumerate(self.issues)}
+        # 每個議題一份：選項名稱 -> 選項代碼
+        self._choice_codes = [{c: code for code, c in enumerate(issue.options)} for issue in self.issues]
+        issue_count = len(self.issues)
+        choice_count = max(len(issue.options) for issue in self.issues)
+        self._log = log
+        self._lock = threading.Lock()
+        # 已送出、正在等待寫入磁碟的 (列位置, 議題)
+        self._pending = set()
+        # 與共用後端同步的進度：後端版本、已讀到的選票序號與委託編號
+        self._sync_lock = threading.Lock()
+        self._synced_version = None
+        self._last_seq = 0
+        self._last_proxy_id = 0
+
+        size = (issue_count, len(self.households))
+        # 每個議題、每一戶的選項代碼，NOT_VOTED 表示尚未投票
+        self._choices = np.full(size, NOT_VOTED, dtype=np.int8)
+        # 每一票的投票序號，用來依投票先後排列已投票清單
+        self._order = np.zeros(size, dtype=np.int32)
+        # 已投票索引：每一戶一列、每個議題一欄，查詢某戶的投票狀態只需讀取一列
+        self._voted = np.zeros((len(self.households), issue_count), dtype=bool)
+        # 計票結果：每個議題、每個選項的票數與區分比例合計，隨每張選票更新
+        self._counts = np.zeros((issue_count, choice_count), dtype=np.int64)
+        self._ratio_units = np.zeros((issue_count, choice_count), dtype=np.int64)
+        # 出席狀態：投出第一張選票即視為出席
+        self._present = np.zeros(len(self.households), dtype=bool)
+        self._present_count = 0
+        self._present_units = 0
+        # 各棟的分組計數，與全體計數一起隨每張選票更新
+        self._building_codes = roster.building_codes
+        self._floor_codes = roster.floor_codes
+        building_count = len(roster.building_names)
+        self._building_present = np.zeros(building_count, dtype=np.int64)
+        self._building_present_units = np.zeros(building_count, dtype=np.int64)
+        self._building_counts = np.zeros((issue_count, building_count, choice_count), dtype=np.int64)
+        self._building_ratio_units = np.zeros((issue_count, building_count, choice_count), dtype=np.int64)
+        self._grid_present = np.zeros((building_count, len(roster.floor_names)), dtype=np.int64)
+        self._turnout_versions = np.zeros(building_count, dtype=np.int64)
+        # 委託出席：委託戶列位置 -> 受託戶列位置，以及受託戶 -> 委託戶列表
+        self._proxy_holder = {}
+        self._principals = {}
+        # 每記錄一票就遞增，供報表判斷是否有新票
+        self.version = 0
+
+    def cast_vote(self, household, issue, choice):
+        """
+        記錄一票，issue 為議題在列表中的位置，choice 為選項名稱
+        若該戶已對此議題投過票則回傳 False
+        """
+        return self.cast_ballots(household, {issue: choice})
+
+    def cast_ballots(self, household, choices):
+        """
+        一次記錄同一戶對多個議題的投票，choices 為 {議題位置: 選項名稱}
+
+        所有選票以單一交易寫入：只要其中任何一個議題該戶已投過票，整批都不記錄並回傳 False。
+        該戶若為受託人，委託戶尚未投票的議題也會在同一筆交易中記錄相同的選擇；
+        委託戶是否已在其他伺服器投票只有後端知道，所以有後端時交給後端處理，寫入後再同步取回。
+        已在其他伺服器投過票時，後端的唯一限制會拒絕寫入，同樣回傳 False，並隨即同步該票。
+        """
+        if household not in self._index:
+            raise KeyError(f"未知的戶號：{household}")
+        codes = {}
+        for issue, choice in choices.items():
+            code = self._choice_codes[issue].get(choice)
+            if code is None:
+                raise ValueError(f"無效的選項：{choice}")
+            codes[issue] = code
+        if not codes:
+            return False
+
+        # 先同步其他伺服器的選票與委託，減少送出後才被後端拒絕的情況
+        self.sync()
+        pos = self._index[household]
+        with self._lock:
+            if any(self._voted[pos, issue] or (pos, issue) in self._pending for issue in codes):
+                return False
+            ballots = [(pos, issue, code) for issue, code in codes.items()]
+            principals = self._principals.get(pos, ())
+            if self._log is None:
+                # 沒有後端時直接連同委託戶尚未投票、也不在寫入中的議題一起記錄
+                for principal in principals:
+                    ballots.extend(
+                        (principal, issue, code) for issue, code in codes.items()
+                        if not self._voted[principal, issue] and (principal, issue) not in self._pending
+                    )
+            keys = [(p, issue) for p, issue, _ in ballots]
+            self._pending.update(keys)
+
+        # 寫入磁碟時不持有鎖，讓同時送出的選票能合併成同一次提交
+        written = False
+        try:
+            rows = [(self.households[p], self.issues[issue].id, code) for p, issue, code in ballots]
+            written = self._log is None or self._log.append(rows)
+        finally:
+            with self._lock:
+                self._pending.difference_update(keys)
+                if written:
+                    for p, issue, code in ballots:
+                        # 寫入後到這裡之間，sync() 可能已從後端讀回並套用這張選票
+                        if not self._voted[p, issue]:
+                            self._apply(p, issue, code)
+        if not written or principals:
+            # 被後端拒絕表示其他伺服器已記錄該戶的選票，取回後畫面才會顯示為已投票；
+            # 受託人寫入成功時則取回後端替委託戶記錄的選票
+            self.sync()
+        return written
+
+    def assign_proxy(self, principal, holder):
+        """
+        登記委託出席：principal 委託 holder 代為投票
+
+        受託人不可再委託他人、委託戶也不可再受託，避免形成委託鏈；
+        同一委託戶只能有一位受託人。無法登記時以 ValueError 說明原因。
+        受託人登記前已投過的議題，委託戶（尚未自行投票的部分）會記錄相同的選擇，出席與比例才會計入。
+        """
+        for household in (principal, holder):
+            if household not in self._index:
+                raise KeyError(f"未知的戶號：{household}")
+        if principal == holder:
+            raise ValueError("委託戶與受託人不可為同一戶")
+        p, h = self._index[principal], self._index[holder]
+        with self._lock:
+            if p in self._proxy_holder:
+                raise ValueError(f"{principal} 已委託 {self.households[self._proxy_holder[p]]}")
+            if p in self._principals:
+                raise ValueError(f"{principal} 已受其他戶委託，不可再委託他人")
+            if h in self._proxy_holder:
+                raise ValueError(f"{holder} 已委託他人，不可受託")
+            if self._log is None:
+                self._link_proxy(p, h)
+                self._copy_ballots(h, p)
+                return
+
+        # 寫入時不持有鎖：等待其他程序的寫入鎖時不會擋住投票與報表；
+        # 後端會在同一筆交易中重新檢查委託鏈，同時登記相衝突的委託只有一筆能寫入
+        if not self._log.add_proxy(principal, holder):
+            self.sync()
+            raise ValueError("其他伺服器已登記相衝突的委託，請重新整理後確認")
+        with self._lock:
+            # 寫入期間 sync() 可能已從後端讀回這筆委託
+            if p not in self._proxy_holder:
+                self._link_proxy(p, h)
+        # 後端已在登記的交易中替委託戶寫入受託人的選票，在此取回
+        self.sync()
+
+    def replay_proxies(self, rows):
+        """
+        重新套用已保存的委託出席 [(委託戶, 受託戶), ...]，不再寫入紀錄
+        """
+        with self._lock:
+            for principal, holder in rows:
+                p, h = self._index.get(principal), self._index.get(holder)
+                # 略過名冊中已不存在的戶號
+                if p is None or h is None or p in self._proxy_holder:
+                    continue
+                self._link_proxy(p, h)
+
+    def sync(self):
+        """
+        套用其他伺服器程序寫入共用後端的新選票與委託，回傳新套用的選票數
+
+        先比對後端的 data_version，沒有變動就直接回傳，每次重新執行頁面都可以呼叫；
+        有變動時只讀取上次同步之後的資料。已有其他執行緒在同步時不等待，直接回傳 0。
+        """
+        if self._log is None or not self._sync_lock.acquire(blocking=False):
+            return 0
+        try:
+            # 先取得版本再讀取資料，讀取期間的新寫入會在下一次同步時取回
+            version = self._log.data_version()
+            if version == self._synced_version:
+                return 0
+            proxies = self._log.proxies_since(self._last_proxy_id)
+            changes = self._log.changes(self._last_seq)
+            self.replay_proxies(row[1:] for row in proxies)
+            # 本程序自己寫入的選票也會讀回，replay 會略過已記錄的 (戶號, 議題)
+            applied = self.replay(row[1:] for row in changes)
+            if proxies:
+                self._last_proxy_id = proxies[-1][0]
+            if changes:
+                self._last_seq = changes[-1][0]
+            self._synced_version = version
+            return applied
+        finally:
+            self._sync_lock.release()
+
+    def _link_proxy(self, p, h):
+        self._proxy_holder[p] = h
+        self._principals.setdefault(h, []).append(p)
+
+    def _copy_ballots(self, h, p):
+        # 沒有後端時使用：委託戶尚未投票的議題記錄受託人已投的選擇，呼叫端須持有鎖
+        for issue in np.flatnonzero(self._voted[h] & ~self._voted[p]).tolist():
+            if (p, issue) not in self._pending:
+                self._apply(p, issue, int(self._choices[issue, h]))
+
+    def principals(self, household):
+        """
+        回傳委託該戶代為投票的戶號列表
+        """
+        return [self.households[p] for p in self._principals.get(self._index[household], ())]
+
+    def proxies(self):
+        """
+        回傳所有委託出席 [(委託戶, 受託戶), ...]
+        """
+        with self._lock:
+            return [(self.households[p], self.households[h]) for p, h in self._proxy_holder.items()]
+
+    def replay(self, rows):
+        """
+        重新套用已保存的選票 [(戶號, 議題代號, 選項代碼), ...]，不再寫入紀錄，回傳實際套用的票數
+        """
+        applied = 0
+        with self._lock:
+            for household, issue_id, code in rows:
+                pos = self._index.get(household)
+                issue = self._issue_index.get(issue_id)
+                # 略過名冊、議題或選項已不存在的舊選票
+                if pos is None or issue is None or not 0 <= code < len(self.issues[issue].options):
+                    continue
+                if not self._voted[pos, issue]:
+                    self._apply(pos, issue, code)
+                    applied += 1
+        return applied
+
+    def _apply(self, pos, issue, code):
+        self.version += 1
+        self._choices[issue, pos] = code
+        self._order[issue, pos] = self.version
+        self._voted[pos, issue] = True
+        self._counts[issue, code] += 1
+        units = int(self.ratio_units[pos])
+        self._ratio_units[issue, code] += units
+        building = self._building_codes[pos]
+        self._building_counts[issue, building, code] += 1
+        self._building_ratio_units[issue, building, code] += units
+        if not self._present[pos]:
+            self._present[pos] = True
+            self._present_count += 1
+            self._present_units += units
+            self._building_present[building] += 1
+            self._building_present_units[building] += units
+            self._grid_present[building, self._floor_codes[pos]] += 1
+            self._turnout_versions[building] += 1
+
+    def has_voted(self, household, issue):
+        return bool(self._voted[self._index[household], issue])
+
+    def pending_issues(self, household):
+        """
+        回傳該戶尚未投票的議題編號列表
+        """
+        return np.flatnonzero(~self._voted[self._index[household]]).tolist()
+
+    def tally(self):
+        """
+        回傳目前的計票結果快照，報表直接讀取累計好的數字
+        """
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return Tally(
+            self._counts.copy(), self._ratio_units.copy(),
+            self._present_count, self._present_units, self.version,
+        )
+
+    def building_tally(self):
+        """
+        回傳目前各棟的出席與計票快照
+        """
+        with self._lock:
+            return BuildingTally(
+                self._building_present.copy(), self._building_present_units.copy(),
+                self._building_counts.copy(), self._building_ratio_units.copy(),
+                self._grid_present.copy(), self._turnout_versions.copy(),
+            )
+
+    def recompute_tally(self):
+        """
+        由全部選票重新計票（稽核用），一次 NumPy 運算處理所有議題
+        """
+        with self._lock:
+            codes = self._choices.copy()
+            version = self.version
+        return self._count_codes(codes, version)
+
+    def audit(self):
+        """
+        比對累計結果與重新計票的結果，一致時回傳 True，全部以整數比對
+        """
+        with self._lock:
+            codes = self._choices.copy()
+            running = self._snapshot()
+            building_present = self._building_present.copy()
+        full = self._count_codes(codes, running.version)
+        present = (codes != NOT_VOTED).any(axis=0)
+        full_building_present = np.bincount(self._building_codes[present], minlength=len(building_present))
+        return (
+            np.array_equal(running.counts, full.counts)
+            and np.array_equal(running.ratio_units, full.ratio_units)
+            and (running.present_count, running.present_units) == (full.present_count, full.present_units)
+            and np.array_equal(building_present, full_building_present)
+        )
+
+    def _count_codes(self, codes, version):
+        issue_count, choice_count = self._counts.shape
+        voted = codes != NOT_VOTED
+        # 將（議題, 選項）攤平成單一索引後以 bincount 一次統計
+        slots = (np.arange(issue_count)[:, None] * choice_count + codes)[voted]
+        size = issue_count * choice_count
+        counts = np.bincount(slots, minlength=size).reshape(issue_count, choice_count)
+        # bincount 的權重只能是浮點數，區分比例改以 np.add.at 做整數累加
+        units = np.zeros(size, dtype=np.int64)
+        np.add.at(units, slots, np.broadcast_to(self.ratio_units, codes.shape)[voted])
+        present = voted.any(axis=0)
+        return Tally(
+            counts, units.reshape(issue_count, choice_count),
+            int(present.sum()), int(self.ratio_units[present].sum()), version,
+        )
+
+    def iter_ballots(self, issue):
+        """
+        依名冊順序逐戶產生 (戶號, 棟別, 區分比例單位, 投票, 投票序號)，供匯出使用
+
+        只在開始時複製該議題的一列選項代碼，之後逐列產生，不建立整份名冊的 DataFrame。
+        尚未投票的戶投票序號為 None。
+        """
+        with self._lock:
+            codes = self._choices[issue].copy()
+            order = self._order[issue].copy()
+        labels = self.issues[issue].options + (NOT_YET_VOTED,)
+        buildings = self.roster.building_names
+        for pos, household in enumerate(self.households):
+            code = int(codes[pos])
+            yield (
+                household,
+                buildings[self.roster.building_codes[pos]],
+                int(self.ratio_units[pos]),
+                labels[code],
+                int(order[pos]) if code != NOT_VOTED else None,
+            )
+
+    def voter_page(self, issue, status=ALL, building=None, offset=0, limit=50):
+        """
+        回傳符合條件的投票名單中的一頁 (DataFrame, 符合條件的總戶數)
+
+        status 可為 ALL、VOTED、NOT_YET_VOTED 或選項名稱；building 為棟別，None 表示全部。
+        篩選直接在選票陣列上進行，只有該頁的資料會組成 DataFrame。
+        已投票的名單依投票先後排列，其餘依名冊順序。
+        """
+        with self._lock:
+            codes = self._choices[issue].copy()
+            order = self._order[issue].copy()
+
+        mask = np.ones(len(codes), dtype=bool)
+        if building is not None:
+            mask &= self.roster.building_codes == self.roster.building_names.index(building)
+        if status == VOTED:
+            mask &= codes != NOT_VOTED
+        elif status == NOT_YET_VOTED:
+            mask &= codes == NOT_VOTED
+        elif status != ALL:
+            mask &= codes == self._choice_codes[issue][status]
+
+        rows = np.flatnonzero(mask)
+        if status not in (ALL, NOT_YET_VOTED):
+            rows = rows[np.argsort(order[rows], kind='stable')]
+        page = rows[offset:offset + limit]
+        labels = np.asarray(self.issues[issue].options + (NOT_YET_VOTED,), dtype=object)
+        frame = pd.DataFrame({
+            '戶號': self.households[page],
+            '區分比例': self.ratios[page],
+            # NOT_VOTED（-1）正好對應到最後一個標籤「未投票」
+            '投票': labels[codes[page]],
+        }, index=np.arange(offset + 1, offset + len(page) + 1))
+        return frame, len(rows)
@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import tempfile
+
+# ================================
+# 投票連結驗證碼
+# ================================
+# 驗證碼取 HMAC-SHA256 的前 12 bytes，以 base64url 編碼為 16 個字元
+TOKEN_BYTES = 12
+
+
+def load_secret(path):
+    """
+    取得簽發驗證碼用的金鑰
+
+    優先使用環境變數 VOTE_TOKEN_SECRET；未設定時讀取 path，檔案不存在則產生一把新的金鑰並存檔。
+    金鑰改變後，先前印出的 QR Code 都會失效，正式環境請固定設定 VOTE_TOKEN_SECRET。
+
+    多個伺服器程序可能同時啟動：新金鑰先完整寫入暫存檔，再以 os.link 放到 path，
+    path 已存在時不會覆蓋，而是改用先建立的那一把，所有程序簽發的驗證碼才會一致。
+    """
+    secret = os.environ.get("VOTE_TOKEN_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    try:
+        return _read_secret(path)
+    except FileNotFoundError:
+        pass
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".vote_token_secret.")
+    try:
+        secret = secrets.token_bytes(32)
+        with os.fdopen(fd, "wb") as f:
+            f.write(secret)
+            f.flush()
+            os.fsync(f.fileno())
+        os.link(temp_path, path)
+        return secret
+    except FileExistsError:
+        # 其他程序已先建立金鑰檔
+        return _read_secret(path)
+    finally:
+        os.unlink(temp_path)
+
+
+def _read_secret(path):
+    with open(path, "rb") as f:
+        secret = f.read()
+    if not secret:
+        raise ValueError(f"金鑰檔 {path} 是空的，請刪除該檔案或設定 VOTE_TOKEN_SECRET")
+    return secret
+
+
+class TokenTable:
+    """
+    全體住戶的投票連結驗證碼
+
+    建立時一次為名冊中的每一戶簽發驗證碼：金鑰只在建立 HMAC 時處理一次，
+    之後每一戶只複製已處理好金鑰的狀態再加入戶號。頁面載入時只需查表並以固定時間比對。
+    """
+
+    def __init__(self, secret, households):
+        keyed = hmac.new(secret, digestmod=hashlib.sha256)
+        self._tokens = {}
+        for household in households:
+            mac = keyed.copy()
+            mac.update(household.encode("utf-8"))
+            digest = mac.digest()[:TOKEN_BYTES]
+            self._tokens[household] = base64.urlsafe_b64encode(digest).decode("ascii")
+
+    def token(self, household):
+        return self._tokens[household]
+
+    def verify(self, household, token):
+        """
+        驗證戶號與驗證碼是否相符
+        """
+        expected = self._tokens.get(household)
+        if expected is None or not token:
+            return False
+        return hmac.compare_digest(expected.encode("ascii"), token.encode("utf-8"))
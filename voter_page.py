@@ -0,0 +1,74 @@
+import sqlite3
+
+import streamlit as st
+
+import metrics
+from app_state import get_agenda, get_roster, get_token_table, get_vote_store, sync_vote_store
+
+# ================================
+# 住戶投票頁
+# ================================
+# QR Code 連結開啟的預設頁面，只顯示該戶的議題與投票表單，
+# 不包含管理者側邊欄與報表，住戶每次操作只需重新執行這一頁
+st.header("住戶投票區")
+st.divider()
+
+ISSUES = get_agenda().issues
+roster = get_roster()
+
+# 檢查 URL 參數以判斷是否有戶號資訊
+query_params = st.query_params
+household_id_from_url = query_params.get("戶號")
+
+if household_id_from_url:
+    if roster is None:
+        st.error("名冊資料載入失敗，請檢查程式碼。")
+    else:
+        vote_store = get_vote_store(roster.digest, ISSUES, roster)
+        sync_vote_store(vote_store)
+        token_table = get_token_table(roster.digest, roster)
+        if token_table.verify(household_id_from_url, query_params.get("token")):
+            household_id = household_id_from_url
+            st.info(f"歡迎戶號 **{household_id}**！")
+            principals = vote_store.principals(household_id)
+            if principals:
+                st.caption(f"您同時受 {'、'.join(principals)} 委託，送出的選擇也會記錄為委託戶尚未投票議題的選票。")
+
+            st.subheader("請對以下所有議題進行投票：")
+
+            open_issues = vote_store.pending_issues(household_id)
+            for i, issue in enumerate(ISSUES):
+                if i not in open_issues:
+                    st.markdown(f"**{issue.title}**")
+                    st.success("您已完成此議題的投票。")
+
+            if open_issues:
+                # 所有尚未投票的議題一次送出，只寫入一次並重新整理一次
+                with st.form("ballot_form"):
+                    for i in open_issues:
+                        issue = ISSUES[i]
+                        st.markdown(f"**{issue.title}**")
+                        st.radio("您的選擇：", issue.options, key=f"radio_{issue.id}")
+                    submitted = st.form_submit_button("確認送出投票")
+                if submitted:
+                    choices = {i: st.session_state[f"radio_{ISSUES[i].id}"] for i in open_issues}
+                    try:
+                        with metrics.VOTE_CAST_SECONDS.time():
+                            cast_ok = vote_store.cast_ballots(household_id, choices)
+                    except sqlite3.Error:
+                        # 資料庫忙碌或寫入失敗時選票沒有記錄，保留畫面上的選擇讓住戶重新送出
+                        metrics.BALLOT_WRITE_ERRORS.inc()
+                        st.error("系統暫時無法記錄您的選票，請稍候再按一次「確認送出投票」。")
+                    else:
+                        if cast_ok:
+                            metrics.BALLOTS_CAST.inc(len(choices))
+                            st.toast("投票成功！感謝您的參與。")
+                        else:
+                            st.toast("部分議題已完成投票，請確認後重新送出。")
+                        st.rerun()
+            else:
+                st.success("您已完成所有議題的投票！")
+        else:
+            st.error("您掃描的 QR Code 無效。請確認您使用的是正確的投票連結。")
+else:
+    st.warning("請掃描您的專屬 QR Code 以進行投票。")